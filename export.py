@@ -21,12 +21,14 @@ import math
 import shlex
 import subprocess
 import uuid
-import shutil
 import struct
-import json
 import sys
 import re
 import string
+import hashlib
+import zlib
+import threading
+import queue
 
 import bpy
 from mathutils import Matrix, Vector
@@ -183,6 +185,7 @@ class MXSExport():
         # clear db, before we start, previous error will cause more errors
         MXSDatabase.clear()
         MXSMotionBlurHelper.clear()
+        MXSMeshCache.clear()
         
         clear_log()
         log("{0} {1} {0}".format("-" * 30, self.__class__.__name__), 0, LogStyles.MESSAGE, prefix="", )
@@ -206,13 +209,26 @@ class MXSExport():
         self.use_instances = mx.export_use_instances
         self.use_wireframe = mx.export_use_wireframe
         self.use_subdivision = mx.export_use_subdivision
+        self.use_auto_instances = mx.export_auto_instances
+        self.use_pipeline = mx.export_pipelined
+        self.pipeline = None
         
-        self._prepare()
-        self._export()
-        self._finish()
+        MXSMeshCache.init()
+        
+        try:
+            self._prepare()
+            self._export()
+            self._finish()
+        except Exception:
+            self._abort()
+            raise
         
         MXSDatabase.clear()
         MXSMotionBlurHelper.clear()
+        MXSMeshCache.clear()
+        sc = self.context.scene
+        if(not MXSMeshCache.animation or sc.frame_current == sc.frame_end):
+            MXSMeshCache.release()
         
         for me in bpy.data.meshes:
             if(me.users == 0):
@@ -226,6 +242,9 @@ class MXSExport():
     def _progress(self, progress=0.0, ):
         if(progress == 0.0):
             progress = self.progress_current / self.progress_count
+            if(self.pipeline is not None):
+                # objects made and objects written
+                progress = (self.progress_current + self.pipeline.done) / (self.progress_count * 2)
             self.progress_current += 1
         
         if(self.engine is not None):
@@ -243,24 +262,31 @@ class MXSExport():
         if(system.PLATFORM == 'Darwin'):
             # Mac OS X specific
             self.data = []
-            self.serialized_data = []
             
             mx = self.context.scene.maxwell_render
             self.keep_intermediates = mx.export_keep_intermediates
+            self.intermediates_float_type = 'f8'
+            if(mx.export_intermediates_single_precision):
+                self.intermediates_float_type = 'f4'
+            self.intermediates_compression = mx.export_intermediates_compression
             
             h, t = os.path.split(self.mxs_path)
             n, e = os.path.splitext(t)
             self.tmp_dir = utils.tmp_dir(purpose='export_scene', uid=self.uuid, use_blend_name=True, )
             
-            self.mesh_data_paths = []
-            self.hair_data_paths = []
-            self.part_data_paths = []
-            self.wire_data_paths = []
-            self.scene_data_name = "{0}-{1}.json".format(n, self.uuid)
+            # all mesh, hair, particles and wire data goes to single file
+            self.pack = tmpio.MXSBinPackWriter(os.path.join(self.tmp_dir, "{0}-{1}.binpack".format(n, self.uuid)))
+            # scene data records are streamed to file as objects are written
+            self.scene_data_name = "{0}-{1}.ndjson".format(n, self.uuid)
+            self.scene_data = tmpio.MXSSceneDataWriter(os.path.join(self.tmp_dir, self.scene_data_name))
             self.script_name = "{0}-{1}.py".format(n, self.uuid)
             
         elif(system.PLATFORM == 'Linux' or system.PLATFORM == 'Windows'):
             self.mxs = mxs.MXSWriter(path=self.mxs_path, append=False, )
+            self.wire_material = self.context.scene.maxwell_render.export_wire_wire_material
+            if(self.use_pipeline):
+                # blender data is read here, mxs is written in another thread at the same time
+                self.pipeline = MXSWriterPipeline(self._write_mxs, )
             # self.hierarchy = []
     
     def _collect(self):
@@ -1148,6 +1174,8 @@ class MXSExport():
             if(bpy.context.scene.camera == c['object']):
                 cam = c['object']
         MXSMotionBlurHelper.init(cam)
+        # move timeline once per substep for all objects
+        MXSMotionBlurHelper.sample(ls, [d['object'] for d in self._meshes + self._bases], )
         
         # count all objects, will be used for progress reporting.. not quite precise, but good for now.. better than nothing
         self.progress_current = 0
@@ -1267,8 +1295,27 @@ class MXSExport():
         
         log("writing meshes:", 1, LogStyles.MESSAGE, )
         meshes = []
+        # {geometry hash: base mesh, }
+        geometries = {}
         for d in self._meshes:
             o = MXSMesh(d)
+            
+            if(self.use_auto_instances and 'extra_options' not in d):
+                k = o._geometry_hash()
+                if(k is not None and k in geometries):
+                    # the same geometry and materials is already exported, make it instance of that
+                    o = MXSMeshInstance(d, geometries[k], )
+                    log("auto instance of '{}'".format(o.m_instanced), 3, )
+                    self._write(o)
+                    
+                    if(self.use_wireframe):
+                        w = MXSWireframeInstances(o, self.wireframe_base_name)
+                        w.m_parent = self.wireframe_container_name
+                        self._write(w)
+                    continue
+                if(k is not None and not o.m_hide):
+                    geometries[k] = o
+            
             self._write(o)
             meshes.append(o)
             
@@ -1380,7 +1427,7 @@ class MXSExport():
                 me = find_mesh(d['object'].name)
                 if(me):
                     qp = None
-                    if(me.quad_pairs):
+                    if(me.quad_pairs is not None and len(me.quad_pairs) > 0):
                         qp = me.quad_pairs
                     o = MXSSubdivision(d, qp, )
                     self._write(o)
@@ -1401,53 +1448,33 @@ class MXSExport():
             allowed = ['MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', ]
             children = ['PARTICLES', 'HAIR', 'SEA', ]
             
-            if(system.PLATFORM == 'Darwin'):
-                # my humble apologies for following if-for-if-for.. loop
-                for g in bpy.data.groups:
-                    gmx = g.maxwell_render
-                    if(gmx.custom_alpha_use):
-                        a = {'name': MXSDatabase.only_sanitize_name(g.name), 'objects': [], 'opaque': gmx.custom_alpha_opaque, }
-                        for o in g.objects:
-                            for mo in self.serialized_data:
-                                if(mo['type'] in allowed):
-                                    orgnm = MXSDatabase.object_original_name_from_export_name(mo['name'])
-                                    if(o.name == orgnm):
-                                        a['objects'].append(mo['name'])
-                                        # also add children of objects such as particles, hair, etc.. objects which are created as child of original
-                                        for ch in self.serialized_data:
-                                            if(ch['type'] in allowed):
-                                                if(ch['parent'] == mo['name']):
-                                                    if(ch['type'] in children):
-                                                        a['objects'].append(ch['name'])
-                                                        break
-                        groups.append(a)
-            elif(system.PLATFORM == 'Linux' or system.PLATFORM == 'Windows'):
-                # really ugly.. i know
-                for g in bpy.data.groups:
-                    gmx = g.maxwell_render
-                    if(gmx.custom_alpha_use):
-                        a = {'name': MXSDatabase.only_sanitize_name(g.name), 'objects': [], 'opaque': gmx.custom_alpha_opaque, }
-                        for o in g.objects:
-                            for mo in self.hierarchy:
-                                # hierarchy: (0: name, 1: parent, 2: type), ...
-                                # type
-                                if(mo[2] in allowed):
-                                    # name
-                                    orgnm = MXSDatabase.object_original_name_from_export_name(mo[0])
-                                    if(o.name == orgnm):
-                                        a['objects'].append(mo[0])
-                                        # also add children of objects such as particles, hair, etc.. objects which are created as child of original
-                                        for ch in self.hierarchy:
-                                            # type
-                                            if(ch[2] in allowed):
-                                                # parent, name
-                                                if(ch[1] == mo[0]):
-                                                    # type
-                                                    if(ch[2] in children):
-                                                        # name
-                                                        a['objects'].append(ch[0])
-                                                        break
-                        groups.append(a)
+            # scene data is not kept in memory on mac, hierarchy is collected on all platforms and has everything needed
+            # really ugly.. i know
+            for g in bpy.data.groups:
+                gmx = g.maxwell_render
+                if(gmx.custom_alpha_use):
+                    a = {'name': MXSDatabase.only_sanitize_name(g.name), 'objects': [], 'opaque': gmx.custom_alpha_opaque, }
+                    for o in g.objects:
+                        for mo in self.hierarchy:
+                            # hierarchy: (0: name, 1: parent, 2: type), ...
+                            # type
+                            if(mo[2] in allowed):
+                                # name
+                                orgnm = MXSDatabase.object_original_name_from_export_name(mo[0])
+                                if(o.name == orgnm):
+                                    a['objects'].append(mo[0])
+                                    # also add children of objects such as particles, hair, etc.. objects which are created as child of original
+                                    for ch in self.hierarchy:
+                                        # type
+                                        if(ch[2] in allowed):
+                                            # parent, name
+                                            if(ch[1] == mo[0]):
+                                                # type
+                                                if(ch[2] in children):
+                                                    # name
+                                                    a['objects'].append(ch[0])
+                                                    break
+                    groups.append(a)
         else:
             alphas = mx.custom_alphas_manual.alphas
             for alpha in alphas:
@@ -1470,33 +1497,18 @@ class MXSExport():
                 
                 allowed = ['MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', ]
                 children = ['PARTICLES', 'HAIR', 'SEA', ]
-                if(system.PLATFORM == 'Darwin'):
-                    for o in obs:
-                        for mo in self.serialized_data:
-                            if(mo['type'] in allowed):
-                                orgnm = MXSDatabase.object_original_name_from_export_name(mo['name'])
-                                if(o.name == orgnm):
-                                    a['objects'].append(mo['name'])
-                                    # also add children of objects such as particles, hair, etc.. objects which are created as child of original
-                                    for ch in self.serialized_data:
-                                        if(ch['type'] in allowed):
-                                            if(ch['parent'] == mo['name']):
-                                                if(ch['type'] in children):
-                                                    a['objects'].append(ch['name'])
-                                                    break
-                elif(system.PLATFORM == 'Linux' or system.PLATFORM == 'Windows'):
-                    for o in obs:
-                        for mo in self.hierarchy:
-                            if(mo[2] in allowed):
-                                orgnm = MXSDatabase.object_original_name_from_export_name(mo[0])
-                                if(o.name == orgnm):
-                                    a['objects'].append(mo[0])
-                                    for ch in self.hierarchy:
-                                        if(ch[2] in allowed):
-                                            if(ch[1] == mo[0]):
-                                                if(ch[2] in children):
-                                                    a['objects'].append(ch[0])
-                                                    break
+                for o in obs:
+                    for mo in self.hierarchy:
+                        if(mo[2] in allowed):
+                            orgnm = MXSDatabase.object_original_name_from_export_name(mo[0])
+                            if(o.name == orgnm):
+                                a['objects'].append(mo[0])
+                                for ch in self.hierarchy:
+                                    if(ch[2] in allowed):
+                                        if(ch[1] == mo[0]):
+                                            if(ch[2] in children):
+                                                a['objects'].append(ch[0])
+                                                break
                 for mat in mats:
                     # only materials with (users - fake_user) > 0
                     u = mat.users
@@ -1547,8 +1559,8 @@ class MXSExport():
                       'uv_channels': o.m_uv_channels,
                       'num_materials': o.m_num_materials,
                       'triangle_materials': o.m_triangle_materials, }
-                p = os.path.join(self.tmp_dir, "{0}.binmesh".format(nm))
-                w = tmpio.MXSBinMeshWriter(p, **md)
+                # identical mesh data is stored once, objects then share blob
+                nm = self.pack.mesh(nm, md, self.intermediates_float_type, self.intermediates_compression, )
                 
                 d = {'name': o.m_name,
                      'num_vertexes': len(o.m_vertices[0]),
@@ -1572,7 +1584,7 @@ class MXSExport():
                      'backface_material': o.m_backface_material,
                      
                      'hide': o.m_hide,
-                     'mesh_data_path': p,
+                     'mesh_data_path': self.pack.path,
                      'base': o.m_base,
                      'pivot': o.m_pivot,
                      'location': o.m_location,
@@ -1588,51 +1600,52 @@ class MXSExport():
                      # 'type': 'MESH',
                      'type': o.m_type, }
                 
-                self.mesh_data_paths.append(p)
-                self.serialized_data.append(d)
+                self.scene_data.write(d)
                 
             elif(o.m_type == 'HAIR'):
                 nm = "{}-{}".format(o.m_name, uuid.uuid1())
-                p = os.path.join(self.tmp_dir, "{0}.binhair".format(nm))
-                w = tmpio.MXSBinHairWriter(p, o.data_locs)
+                self.pack.hair(nm, o.data_locs, )
                 a = o._repr()
-                a['hair_data_path'] = p
-                self.hair_data_paths.append(p)
+                a['hair_data_path'] = self.pack.path
+                a['hair_data'] = nm
                 
-                self.serialized_data.append(a)
+                self.scene_data.write(a)
             elif(o.m_type == 'PARTICLES'):
                 if(o.mxex.source != 'EXTERNAL_BIN'):
                     # not existing external .bin
                     if(o.m_embed):
                         # and data will be embedded in mxs (no external bin created)
                         nm = "{}-{}".format(o.m_name, uuid.uuid1())
-                        p = os.path.join(self.tmp_dir, "{0}.binpart".format(nm))
-                        w = tmpio.MXSBinParticlesWriter(p, o.m_pdata)
-                        o.m_pdata = p
-                        self.part_data_paths.append(p)
+                        self.pack.particles(nm, o.m_pdata, )
+                        o.m_pdata = self.pack.path
+                        o.m_pdata_name = nm
                 a = o._repr()
-                self.serialized_data.append(a)
+                self.scene_data.write(a)
             elif(o.m_type == 'CLONER'):
                 if(o.mxex.source != 'EXTERNAL_BIN'):
                     if(o.m_embed):
                         nm = "{}-{}".format(o.m_name, uuid.uuid1())
-                        p = os.path.join(self.tmp_dir, "{0}.binpart".format(nm))
-                        w = tmpio.MXSBinParticlesWriter(p, o.m_pdata)
-                        o.m_pdata = p
-                        self.part_data_paths.append(p)
+                        self.pack.particles(nm, o.m_pdata, )
+                        o.m_pdata = self.pack.path
+                        o.m_pdata_name = nm
                 a = o._repr()
-                self.serialized_data.append(a)
+                self.scene_data.write(a)
+            elif(o.m_type == 'SUBDIVISION'):
+                a = o._repr()
+                if(a['quad_pairs'] is not None):
+                    # int array to json
+                    a['quad_pairs'] = a['quad_pairs'].tolist()
+                self.scene_data.write(a)
             elif(o.m_type == 'WIREFRAME_INSTANCES'):
                 n = "{}-{}".format(o.m_name, uuid.uuid1())
-                p = os.path.join(self.tmp_dir, "{0}.binwire".format(n))
-                w = tmpio.MXSBinWireWriter(p, o.m_wire_matrices)
-                self.wire_data_paths.append(p)
+                self.pack.wire(n, o.m_wire_matrices, )
                 a = o._repr()
-                a['wire_matrices'] = p
-                self.serialized_data.append(a)
+                a['wire_matrices'] = self.pack.path
+                a['wire_data'] = n
+                self.scene_data.write(a)
             else:
                 a = o._repr()
-                self.serialized_data.append(a)
+                self.scene_data.write(a)
             
             allowed = ['EMPTY', 'MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', ]
             if(o.m_type in allowed):
@@ -1642,253 +1655,272 @@ class MXSExport():
             if(o.skip):
                 return
             
-            def pack_object_props(o):
-                return (o.m_hide, o.m_opacity, o.m_object_id, o.m_hidden_camera, o.m_hidden_camera_in_shadow_channel,
-                        o.m_hidden_global_illumination, o.m_hidden_reflections_refractions, o.m_hidden_zclip_planes,
-                        o.m_blocked_emitters, )
-            
-            def pack_matrix(o):
-                return (o.m_base, o.m_pivot, o.m_location, o.m_rotation, o.m_scale, )
-            
-            def pack_prefix(o, prefix, rm=True, ):
-                d = o._repr()
-                r = {}
-                l = len(prefix)
-                for k, v in d.items():
-                    if(k.startswith(prefix)):
-                        if(not rm):
-                            r[k] = v
-                        else:
-                            r[k[l:]] = v
-                return r
+            if(o.m_type == 'SCENE'):
+                # resolve paths here, writer thread can't use blender api
+                o.output_mxi_path = bpy.path.abspath(o.m_output_mxi)
+                o.output_image_path = bpy.path.abspath(o.m_output_image)
             
-            if(o.m_type == 'MATERIAL'):
-                self.mxs.material(o._repr())
-            elif(o.m_type == 'CAMERA'):
-                props = (o.m_name, o.m_number_of_steps, o.m_shutter, o.m_film_width, o.m_film_height, o.m_iso, o.m_aperture, o.m_diaphragm_angle,
-                         o.m_diaphragm_blades, o.m_frame_rate, o.m_resolution_x, o.m_resolution_y, o.m_pixel_aspect, o.m_lens, )
-                steps = o.m_steps
-                lens_extra = None
-                if(o.m_lens != 0):
-                    if(o.m_lens == 3):
-                        lens_extra = o.m_fov
-                    elif(o.m_lens == 4):
-                        lens_extra = o.m_azimuth
-                    elif(o.m_lens == 5):
-                        lens_extra = o.m_angle
-                    elif(o.m_lens == 6):
-                        lens_extra = (o.m_lls_type, o.m_lls_fovv, o.m_lls_fovh, o.m_lls_flip_ray_x, o.m_lls_flip_ray_y,
-                                      o.m_lls_parallax_distance, o.m_lls_zenith_mode, o.m_lls_separation, o.m_lls_separation_map, )
-                    elif(o.m_lens == 7):
-                        lens_extra = (o.m_fs_type, o.m_fs_fov, o.m_fs_separation, o.m_fs_separation_map, o.m_fs_vertical_mode, o.m_fs_dome_radius,
-                                      o.m_fs_head_turn_map, o.m_fs_dome_tilt_compensation, o.m_fs_dome_tilt, o.m_fs_head_tilt_map, )
-                screen_region = None
-                if(o.m_screen_region != 'NONE'):
-                    screen_region = o.m_screen_region_xywh
-                    screen_region = screen_region + (o.m_screen_region, )
-                custom_bokeh = None
-                if(o.m_custom_bokeh):
-                    custom_bokeh = (o.m_bokeh_ratio, o.m_bokeh_angle, o.m_custom_bokeh)
-                cut_planes = None
-                if(o.m_set_cut_planes[2] != 0):
-                    cut_planes = o.m_set_cut_planes
-                shift_lens = None
-                if(o.m_set_shift_lens != (0.0, 0.0)):
-                    shift_lens = o.m_set_shift_lens
-                self.mxs.camera(props, steps, o.m_active, lens_extra, o.m_response, screen_region, custom_bokeh, cut_planes, shift_lens, )
-            elif(o.m_type == 'EMPTY'):
-                self.mxs.empty(o.m_name, pack_matrix(o), o.m_motion_blur, pack_object_props(o), )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'MESH'):
-                self.mxs.mesh(o.m_name, pack_matrix(o), o.m_motion_blur, o.m_num_positions,
-                              o.m_vertices, o.m_normals, o.m_triangles, o.m_triangle_normals,
-                              o.m_uv_channels, pack_object_props(o), o.m_num_materials,
-                              o.m_materials, o.m_triangle_materials, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'MESH_INSTANCE'):
-                self.mxs.instance(o.m_name, o.m_instanced, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_materials, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'SCENE'):
-                other = {'protect': o.m_export_protect_mxs,
-                         'extra_sampling_enabled': o.m_extra_sampling_enabled,
-                         'extra_sampling_sl': o.m_extra_sampling_sl,
-                         'extra_sampling_mask': o.m_extra_sampling_mask,
-                         'extra_sampling_custom_alpha': o.m_extra_sampling_custom_alpha,
-                         'extra_sampling_user_bitmap': o.m_extra_sampling_user_bitmap,
-                         'extra_sampling_invert': o.m_extra_sampling_invert, }
-                
-                self.mxs.parameters(pack_prefix(o, 'scene_', ),
-                                    pack_prefix(o, 'materials_', ),
-                                    pack_prefix(o, 'globals_', ),
-                                    pack_prefix(o, 'tone_', ),
-                                    pack_prefix(o, 'simulens_', ),
-                                    pack_prefix(o, 'illum_caustics_', ),
-                                    other,
-                                    pack_prefix(o, 'overlay_', ), )
-                
-                mxi = None
-                if(o.m_output_mxi_enabled):
-                    mxi = bpy.path.abspath(o.m_output_mxi)
-                image = None
-                image_depth = None
-                if(o.m_output_image_enabled):
-                    image = bpy.path.abspath(o.m_output_image)
-                    image_depth = o.m_output_depth
-                if(mxi is not None):
-                    h, t = os.path.split(mxi)
-                    n, e = os.path.splitext(t)
-                    base_path = os.path.join(h, n)
-                elif(image is not None):
-                    h, t = os.path.split(image)
-                    n, e = os.path.splitext(t)
-                    base_path = os.path.join(h, n)
-                else:
-                    h, t = os.path.split(self.mxs_path)
-                    n, e = os.path.splitext(t)
-                    base_path = os.path.join(h, n)
-                channels_output_mode = o.m_channels_output_mode
-                channels_render = o.m_channels_render
-                channels_render_type = o.m_channels_render_type
-                
-                self.mxs.channels(base_path, mxi, image, image_depth, channels_output_mode, channels_render, channels_render_type, pack_prefix(o, 'channels_', False, ), )
-                
-                self.mxs.custom_alphas(o.m_channels_custom_alpha_groups)
-                
-            elif(o.m_type == 'ENVIRONMENT'):
-                env_type = o.m_env_type
-                if(env_type == 'NONE'):
-                    self.mxs.environment(None)
-                    return
-                
-                sky_type = o.m_sky_type
-                sky = pack_prefix(o, 'sky_', False, )
-                dome = pack_prefix(o, 'dome_', False, )
-                sun_type = o.m_sun_type
-                sun = None
-                if(sun_type != 'DISABLED'):
-                    sun = pack_prefix(o, 'sun_', False, )
-                    v = Vector((o.m_sun_dir_x, o.m_sun_dir_y, o.m_sun_dir_z))
-                    sun['sun_dir_x'] = v.x
-                    sun['sun_dir_y'] = v.y
-                    sun['sun_dir_z'] = v.z
-                ibl = None
-                if(env_type == 'IMAGE_BASED'):
-                    ibl = pack_prefix(o, 'ibl_', False, )
-                
-                self.mxs.environment(env_type, sky_type, sky, dome, sun_type, sun, ibl, )
-            elif(o.m_type == 'PARTICLES'):
-                properties = pack_prefix(o, 'bin_', )
-                properties['embed'] = o.m_embed
-                properties['pdata'] = o.m_pdata
-                self.mxs.ext_particles(o.m_name, properties, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_material, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'HAIR'):
-                if(o.m_extension == 'MGrassP'):
-                    rr = o.m_grass_root_width
-                    tr = o.m_grass_tip_width
-                    dm = o.m_display_max_blades
-                else:
-                    rr = o.m_hair_root_radius
-                    tr = o.m_hair_tip_radius
-                    dm = o.m_display_max_hairs
-                
-                data = o.m_data
-                data['HAIR_POINTS'] = o.data_locs
-                
-                self.mxs.ext_hair(o.m_name, o.m_extension, pack_matrix(o), o.m_motion_blur,
-                                  rr, tr, o.m_data, pack_object_props(o), o.m_display_percent,
-                                  dm, o.m_material, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'REFERENCE'):
-                flags = (o.m_flag_override_hide, o.m_flag_override_hide_to_camera, o.m_flag_override_hide_to_refl_refr, o.m_flag_override_hide_to_gi, )
-                self.mxs.reference(o.m_name, o.m_path, flags, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_material, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'VOLUMETRICS'):
-                properties = (o.m_vtype, o.m_density, o.m_noise_seed, o.m_noise_low, o.m_noise_high, o.m_noise_detail, o.m_noise_octaves, o.m_noise_persistence)
-                self.mxs.ext_volumetrics(o.m_name, properties, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_material, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'SUBDIVISION'):
-                self.mxs.mod_subdivision(o.m_object, o.m_level, o.m_scheme, o.m_interpolation, o.m_crease, o.m_smooth, o.m_quad_pairs, )
-            elif(o.m_type == 'SCATTER'):
-                density = (o.m_density, o.m_density_map, )
-                scale = (o.m_scale_x, o.m_scale_y, o.m_scale_z, o.m_scale_map, o.m_scale_variation_x, o.m_scale_variation_y, o.m_scale_variation_z, o.m_scale_uniform, )
-                rotation = (o.m_rotation_x, o.m_rotation_y, o.m_rotation_z, o.m_rotation_map,
-                            o.m_rotation_variation_x, o.m_rotation_variation_y, o.m_rotation_variation_z, o.m_rotation_direction, )
-                lod = (o.m_lod, o.m_lod_min_distance, o.m_lod_max_distance, o.m_lod_max_distance_density, )
-                angle = (o.m_direction_type, o.m_initial_angle, o.m_initial_angle_variation, o.m_initial_angle_map, )
-                self.mxs.mod_scatter(o.m_object, o.m_scatter_object, o.m_inherit_objectid, o.m_remove_overlapped, density, o.m_seed, scale, rotation, lod, angle, o.m_display_percent, o.m_display_max_blades, )
-            elif(o.m_type == 'GRASS'):
-                properties = {'density': o.m_density,
-                              'density_map': o.m_density_map,
-                              'length': o.m_length,
-                              'length_map': o.m_length_map,
-                              'length_variation': o.m_length_variation,
-                              'root_width': o.m_root_width,
-                              'tip_width': o.m_tip_width,
-                              'direction_type': o.m_direction_type,
-                              'initial_angle': o.m_initial_angle,
-                              'initial_angle_map': o.m_initial_angle_map,
-                              'initial_angle_variation': o.m_initial_angle_variation,
-                              'start_bend': o.m_start_bend,
-                              'start_bend_map': o.m_start_bend_map,
-                              'start_bend_variation': o.m_start_bend_variation,
-                              'bend_radius': o.m_bend_radius,
-                              'bend_radius_map': o.m_bend_radius_map,
-                              'bend_radius_variation': o.m_bend_radius_variation,
-                              'bend_angle': o.m_bend_angle,
-                              'bend_angle_map': o.m_bend_angle_map,
-                              'bend_angle_variation': o.m_bend_angle_variation,
-                              'cut_off': o.m_cut_off,
-                              'cut_off_map': o.m_cut_off_map,
-                              'cut_off_variation': o.m_cut_off_variation,
-                              'points_per_blade': o.m_points_per_blade,
-                              'primitive_type': o.m_primitive_type,
-                              'seed': o.m_seed,
-                              'lod': o.m_lod,
-                              'lod_max_distance': o.m_lod_max_distance,
-                              'lod_max_distance_density': o.m_lod_max_distance_density,
-                              'lod_min_distance': o.m_lod_min_distance,
-                              'display_max_blades': o.m_display_max_blades,
-                              'display_percent': o.m_display_percent, }
-                self.mxs.mod_grass(o.m_object, properties, o.m_material, o.m_backface_material, )
-            elif(o.m_type == 'CLONER'):
-                self.mxs.mod_cloner(o.m_parent, o.m_cloned_object, o.m_render_emitter, o.m_pdata, o.m_radius, o.m_mb_factor,
-                                    o.m_load_percent, o.m_start_offset, o.m_extra_npp, o.m_extra_p_dispersion, o.m_extra_p_deformation,
-                                    o.m_align_to_velocity, o.m_scale_with_radius, o.m_inherit_obj_id, o.m_frame, o.m_fps,
-                                    o.m_display_percent, o.m_display_max, )
-            elif(o.m_type == 'SEA'):
-                geometry = (o.m_reference_time, o.m_resolution, o.m_ocean_depth, o.m_vertical_scale, o.m_ocean_dim, o.m_ocean_seed,
-                            o.m_enable_choppyness, o.m_choppy_factor, o.m_enable_white_caps, )
-                wind = (o.m_ocean_wind_mod, o.m_ocean_wind_dir, o.m_ocean_wind_alignment, o.m_ocean_min_wave_length, o.m_damp_factor_against_wind, )
-                self.mxs.ext_sea(o.m_name, pack_matrix(o), o.m_motion_blur, pack_object_props(o), geometry, wind, o.m_material, o.m_backface_material, )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'WIREFRAME_CONTAINER'):
-                self.mxs.empty(o.m_name, pack_matrix(o), pack_object_props(o), )
-                self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
-            elif(o.m_type == 'WIREFRAME_BASE'):
-                self.mxs.mesh(o.m_name, pack_matrix(o), o.m_num_positions,
-                              o.m_vertices, o.m_normals, o.m_triangles, o.m_triangle_normals,
-                              o.m_uv_channels, pack_object_props(o), o.m_num_materials,
-                              o.m_materials, o.m_triangle_materials, o.m_backface_material, )
+            # hierarchy is also used by custom alphas on main thread, never append from writer thread
+            allowed = ['EMPTY', 'MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA',
+                       'WIREFRAME_CONTAINER', 'WIREFRAME_BASE', ]
+            if(o.m_type in allowed):
                 self.hierarchy.append((o.m_name, o.m_parent, o.m_type))
             elif(o.m_type == 'WIREFRAME_INSTANCES'):
-                e = self.wireframe_base_name
                 c = self.wireframe_container_name
-                p = pack_object_props(o)
-                wm = bpy.context.scene.maxwell_render.export_wire_wire_material
-                for i, m in enumerate(o.m_wire_matrices):
-                    n = "{0}-{1}".format(o.m_name, i)
-                    self.mxs.instance(n, e, m, p, wm, None, )
-                    self.hierarchy.append((n, c, 'MESH_INSTANCE'))
+                for i in range(len(o.m_wire_matrices)):
+                    self.hierarchy.append(("{0}-{1}".format(o.m_name, i), c, 'MESH_INSTANCE'))
+            
+            if(self.pipeline is not None):
+                extra = ()
+                if(o.m_type == 'SCENE'):
+                    extra = ('output_mxi_path', 'output_image_path', )
+                elif(o.m_type == 'HAIR'):
+                    extra = ('data_locs', )
+                self.pipeline.put(MXSPayload(o, extra, ))
             else:
-                raise TypeError("{0} is unknown type".format(o.m_type))
+                self._write_mxs(o)
+        
+        if(o.m_type == 'MESH'):
+            # arrays are in mxs, intermediate file or writer queue now, keep only what is needed for instances and modifiers
+            o._release()
+    
+    def _write_mxs(self, o, ):
+        """Write object to mxs.MXSWriter, only data prepared in object are used, so it can be called from another thread."""
+        def pack_object_props(o):
+            return (o.m_hide, o.m_opacity, o.m_object_id, o.m_hidden_camera, o.m_hidden_camera_in_shadow_channel,
+                    o.m_hidden_global_illumination, o.m_hidden_reflections_refractions, o.m_hidden_zclip_planes,
+                    o.m_blocked_emitters, )
+        
+        def pack_matrix(o):
+            return (o.m_base, o.m_pivot, o.m_location, o.m_rotation, o.m_scale, )
+        
+        def pack_prefix(o, prefix, rm=True, ):
+            d = o._repr()
+            r = {}
+            l = len(prefix)
+            for k, v in d.items():
+                if(k.startswith(prefix)):
+                    if(not rm):
+                        r[k] = v
+                    else:
+                        r[k[l:]] = v
+            return r
+        
+        if(o.m_type == 'MATERIAL'):
+            self.mxs.material(o._repr())
+        elif(o.m_type == 'CAMERA'):
+            props = (o.m_name, o.m_number_of_steps, o.m_shutter, o.m_film_width, o.m_film_height, o.m_iso, o.m_aperture, o.m_diaphragm_angle,
+                     o.m_diaphragm_blades, o.m_frame_rate, o.m_resolution_x, o.m_resolution_y, o.m_pixel_aspect, o.m_lens, )
+            steps = o.m_steps
+            lens_extra = None
+            if(o.m_lens != 0):
+                if(o.m_lens == 3):
+                    lens_extra = o.m_fov
+                elif(o.m_lens == 4):
+                    lens_extra = o.m_azimuth
+                elif(o.m_lens == 5):
+                    lens_extra = o.m_angle
+                elif(o.m_lens == 6):
+                    lens_extra = (o.m_lls_type, o.m_lls_fovv, o.m_lls_fovh, o.m_lls_flip_ray_x, o.m_lls_flip_ray_y,
+                                  o.m_lls_parallax_distance, o.m_lls_zenith_mode, o.m_lls_separation, o.m_lls_separation_map, )
+                elif(o.m_lens == 7):
+                    lens_extra = (o.m_fs_type, o.m_fs_fov, o.m_fs_separation, o.m_fs_separation_map, o.m_fs_vertical_mode, o.m_fs_dome_radius,
+                                  o.m_fs_head_turn_map, o.m_fs_dome_tilt_compensation, o.m_fs_dome_tilt, o.m_fs_head_tilt_map, )
+            screen_region = None
+            if(o.m_screen_region != 'NONE'):
+                screen_region = o.m_screen_region_xywh
+                screen_region = screen_region + (o.m_screen_region, )
+            custom_bokeh = None
+            if(o.m_custom_bokeh):
+                custom_bokeh = (o.m_bokeh_ratio, o.m_bokeh_angle, o.m_custom_bokeh)
+            cut_planes = None
+            if(o.m_set_cut_planes[2] != 0):
+                cut_planes = o.m_set_cut_planes
+            shift_lens = None
+            if(o.m_set_shift_lens != (0.0, 0.0)):
+                shift_lens = o.m_set_shift_lens
+            self.mxs.camera(props, steps, o.m_active, lens_extra, o.m_response, screen_region, custom_bokeh, cut_planes, shift_lens, )
+        elif(o.m_type == 'EMPTY'):
+            self.mxs.empty(o.m_name, pack_matrix(o), o.m_motion_blur, pack_object_props(o), )
+        elif(o.m_type == 'MESH'):
+            self.mxs.mesh(o.m_name, pack_matrix(o), o.m_motion_blur, o.m_num_positions,
+                          o.m_vertices, o.m_normals, o.m_triangles, o.m_triangle_normals,
+                          o.m_uv_channels, pack_object_props(o), o.m_num_materials,
+                          o.m_materials, o.m_triangle_materials, o.m_backface_material, )
+        elif(o.m_type == 'MESH_INSTANCE'):
+            self.mxs.instance(o.m_name, o.m_instanced, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_materials, o.m_backface_material, )
+        elif(o.m_type == 'SCENE'):
+            other = {'protect': o.m_export_protect_mxs,
+                     'extra_sampling_enabled': o.m_extra_sampling_enabled,
+                     'extra_sampling_sl': o.m_extra_sampling_sl,
+                     'extra_sampling_mask': o.m_extra_sampling_mask,
+                     'extra_sampling_custom_alpha': o.m_extra_sampling_custom_alpha,
+                     'extra_sampling_user_bitmap': o.m_extra_sampling_user_bitmap,
+                     'extra_sampling_invert': o.m_extra_sampling_invert, }
+            
+            self.mxs.parameters(pack_prefix(o, 'scene_', ),
+                                pack_prefix(o, 'materials_', ),
+                                pack_prefix(o, 'globals_', ),
+                                pack_prefix(o, 'tone_', ),
+                                pack_prefix(o, 'simulens_', ),
+                                pack_prefix(o, 'illum_caustics_', ),
+                                other,
+                                pack_prefix(o, 'overlay_', ), )
+            
+            mxi = None
+            if(o.m_output_mxi_enabled):
+                mxi = o.output_mxi_path
+            image = None
+            image_depth = None
+            if(o.m_output_image_enabled):
+                image = o.output_image_path
+                image_depth = o.m_output_depth
+            if(mxi is not None):
+                h, t = os.path.split(mxi)
+                n, e = os.path.splitext(t)
+                base_path = os.path.join(h, n)
+            elif(image is not None):
+                h, t = os.path.split(image)
+                n, e = os.path.splitext(t)
+                base_path = os.path.join(h, n)
+            else:
+                h, t = os.path.split(self.mxs_path)
+                n, e = os.path.splitext(t)
+                base_path = os.path.join(h, n)
+            channels_output_mode = o.m_channels_output_mode
+            channels_render = o.m_channels_render
+            channels_render_type = o.m_channels_render_type
+            
+            self.mxs.channels(base_path, mxi, image, image_depth, channels_output_mode, channels_render, channels_render_type, pack_prefix(o, 'channels_', False, ), )
+            
+            self.mxs.custom_alphas(o.m_channels_custom_alpha_groups)
+            
+        elif(o.m_type == 'ENVIRONMENT'):
+            env_type = o.m_env_type
+            if(env_type == 'NONE'):
+                self.mxs.environment(None)
+                return
+            
+            sky_type = o.m_sky_type
+            sky = pack_prefix(o, 'sky_', False, )
+            dome = pack_prefix(o, 'dome_', False, )
+            sun_type = o.m_sun_type
+            sun = None
+            if(sun_type != 'DISABLED'):
+                sun = pack_prefix(o, 'sun_', False, )
+                v = Vector((o.m_sun_dir_x, o.m_sun_dir_y, o.m_sun_dir_z))
+                sun['sun_dir_x'] = v.x
+                sun['sun_dir_y'] = v.y
+                sun['sun_dir_z'] = v.z
+            ibl = None
+            if(env_type == 'IMAGE_BASED'):
+                ibl = pack_prefix(o, 'ibl_', False, )
+            
+            self.mxs.environment(env_type, sky_type, sky, dome, sun_type, sun, ibl, )
+        elif(o.m_type == 'PARTICLES'):
+            properties = pack_prefix(o, 'bin_', )
+            properties['embed'] = o.m_embed
+            properties['pdata'] = o.m_pdata
+            self.mxs.ext_particles(o.m_name, properties, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_material, o.m_backface_material, )
+        elif(o.m_type == 'HAIR'):
+            if(o.m_extension == 'MGrassP'):
+                rr = o.m_grass_root_width
+                tr = o.m_grass_tip_width
+                dm = o.m_display_max_blades
+            else:
+                rr = o.m_hair_root_radius
+                tr = o.m_hair_tip_radius
+                dm = o.m_display_max_hairs
+            
+            data = o.m_data
+            data['HAIR_POINTS'] = o.data_locs
+            
+            self.mxs.ext_hair(o.m_name, o.m_extension, pack_matrix(o), o.m_motion_blur,
+                              rr, tr, o.m_data, pack_object_props(o), o.m_display_percent,
+                              dm, o.m_material, o.m_backface_material, )
+        elif(o.m_type == 'REFERENCE'):
+            flags = (o.m_flag_override_hide, o.m_flag_override_hide_to_camera, o.m_flag_override_hide_to_refl_refr, o.m_flag_override_hide_to_gi, )
+            self.mxs.reference(o.m_name, o.m_path, flags, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_material, o.m_backface_material, )
+        elif(o.m_type == 'VOLUMETRICS'):
+            properties = (o.m_vtype, o.m_density, o.m_noise_seed, o.m_noise_low, o.m_noise_high, o.m_noise_detail, o.m_noise_octaves, o.m_noise_persistence)
+            self.mxs.ext_volumetrics(o.m_name, properties, pack_matrix(o), o.m_motion_blur, pack_object_props(o), o.m_material, o.m_backface_material, )
+        elif(o.m_type == 'SUBDIVISION'):
+            self.mxs.mod_subdivision(o.m_object, o.m_level, o.m_scheme, o.m_interpolation, o.m_crease, o.m_smooth, o.m_quad_pairs, )
+        elif(o.m_type == 'SCATTER'):
+            density = (o.m_density, o.m_density_map, )
+            scale = (o.m_scale_x, o.m_scale_y, o.m_scale_z, o.m_scale_map, o.m_scale_variation_x, o.m_scale_variation_y, o.m_scale_variation_z, o.m_scale_uniform, )
+            rotation = (o.m_rotation_x, o.m_rotation_y, o.m_rotation_z, o.m_rotation_map,
+                        o.m_rotation_variation_x, o.m_rotation_variation_y, o.m_rotation_variation_z, o.m_rotation_direction, )
+            lod = (o.m_lod, o.m_lod_min_distance, o.m_lod_max_distance, o.m_lod_max_distance_density, )
+            angle = (o.m_direction_type, o.m_initial_angle, o.m_initial_angle_variation, o.m_initial_angle_map, )
+            self.mxs.mod_scatter(o.m_object, o.m_scatter_object, o.m_inherit_objectid, o.m_remove_overlapped, density, o.m_seed, scale, rotation, lod, angle, o.m_display_percent, o.m_display_max_blades, )
+        elif(o.m_type == 'GRASS'):
+            properties = {'density': o.m_density,
+                          'density_map': o.m_density_map,
+                          'length': o.m_length,
+                          'length_map': o.m_length_map,
+                          'length_variation': o.m_length_variation,
+                          'root_width': o.m_root_width,
+                          'tip_width': o.m_tip_width,
+                          'direction_type': o.m_direction_type,
+                          'initial_angle': o.m_initial_angle,
+                          'initial_angle_map': o.m_initial_angle_map,
+                          'initial_angle_variation': o.m_initial_angle_variation,
+                          'start_bend': o.m_start_bend,
+                          'start_bend_map': o.m_start_bend_map,
+                          'start_bend_variation': o.m_start_bend_variation,
+                          'bend_radius': o.m_bend_radius,
+                          'bend_radius_map': o.m_bend_radius_map,
+                          'bend_radius_variation': o.m_bend_radius_variation,
+                          'bend_angle': o.m_bend_angle,
+                          'bend_angle_map': o.m_bend_angle_map,
+                          'bend_angle_variation': o.m_bend_angle_variation,
+                          'cut_off': o.m_cut_off,
+                          'cut_off_map': o.m_cut_off_map,
+                          'cut_off_variation': o.m_cut_off_variation,
+                          'points_per_blade': o.m_points_per_blade,
+                          'primitive_type': o.m_primitive_type,
+                          'seed': o.m_seed,
+                          'lod': o.m_lod,
+                          'lod_max_distance': o.m_lod_max_distance,
+                          'lod_max_distance_density': o.m_lod_max_distance_density,
+                          'lod_min_distance': o.m_lod_min_distance,
+                          'display_max_blades': o.m_display_max_blades,
+                          'display_percent': o.m_display_percent, }
+            self.mxs.mod_grass(o.m_object, properties, o.m_material, o.m_backface_material, )
+        elif(o.m_type == 'CLONER'):
+            self.mxs.mod_cloner(o.m_parent, o.m_cloned_object, o.m_render_emitter, o.m_pdata, o.m_radius, o.m_mb_factor,
+                                o.m_load_percent, o.m_start_offset, o.m_extra_npp, o.m_extra_p_dispersion, o.m_extra_p_deformation,
+                                o.m_align_to_velocity, o.m_scale_with_radius, o.m_inherit_obj_id, o.m_frame, o.m_fps,
+                                o.m_display_percent, o.m_display_max, )
+        elif(o.m_type == 'SEA'):
+            geometry = (o.m_reference_time, o.m_resolution, o.m_ocean_depth, o.m_vertical_scale, o.m_ocean_dim, o.m_ocean_seed,
+                        o.m_enable_choppyness, o.m_choppy_factor, o.m_enable_white_caps, )
+            wind = (o.m_ocean_wind_mod, o.m_ocean_wind_dir, o.m_ocean_wind_alignment, o.m_ocean_min_wave_length, o.m_damp_factor_against_wind, )
+            self.mxs.ext_sea(o.m_name, pack_matrix(o), o.m_motion_blur, pack_object_props(o), geometry, wind, o.m_material, o.m_backface_material, )
+        elif(o.m_type == 'WIREFRAME_CONTAINER'):
+            self.mxs.empty(o.m_name, pack_matrix(o), pack_object_props(o), )
+        elif(o.m_type == 'WIREFRAME_BASE'):
+            self.mxs.mesh(o.m_name, pack_matrix(o), o.m_num_positions,
+                          o.m_vertices, o.m_normals, o.m_triangles, o.m_triangle_normals,
+                          o.m_uv_channels, pack_object_props(o), o.m_num_materials,
+                          o.m_materials, o.m_triangle_materials, o.m_backface_material, )
+        elif(o.m_type == 'WIREFRAME_INSTANCES'):
+            e = self.wireframe_base_name
+            p = pack_object_props(o)
+            wm = self.wire_material
+            for i, m in enumerate(o.m_wire_matrices):
+                n = "{0}-{1}".format(o.m_name, i)
+                self.mxs.instance(n, e, m, p, wm, None, )
+        else:
+            raise TypeError("{0} is unknown type".format(o.m_type))
     
     def _finish(self):
         if(system.PLATFORM == 'Darwin'):
             # Mac OS X specific
-            log("writing serialized scene data..".format(), 1, LogStyles.MESSAGE, )
-            p = self._serialize(self.serialized_data, self.scene_data_name)
-            self.scene_data_path = p
+            self.pack.close()
+            self.scene_data.close()
+            self.scene_data_path = self.scene_data.path
             # generate and execute py32 script
             log("running pymaxwell..".format(), 1, LogStyles.MESSAGE, )
             self._pymaxwell()
@@ -1897,6 +1929,15 @@ class MXSExport():
             self._cleanup()
             log("mxs saved in: {0}".format(self.mxs_path), 1, LogStyles.MESSAGE, )
         elif(system.PLATFORM == 'Linux' or system.PLATFORM == 'Windows'):
+            if(self.pipeline is not None):
+                log("waiting for mxs writer..".format(), 1, LogStyles.MESSAGE, )
+                
+                def tick():
+                    self._progress(min((self.progress_count + self.pipeline.done) / (self.progress_count * 2), 1.0))
+                
+                self.pipeline.close(tick, )
+                self.pipeline = None
+            
             log("setting object hierarchy..".format(), 1, LogStyles.MESSAGE, )
             self.mxs.hierarchy(self.hierarchy)
             
@@ -1915,16 +1956,16 @@ class MXSExport():
         
         self._progress(1.0)
     
-    def _serialize(self, d, n, ):
-        if(not n.endswith(".json")):
-            n = "{}.json".format(n)
-        p = os.path.join(self.tmp_dir, n)
-        with open("{0}.tmp".format(p), 'w', encoding='utf-8', ) as f:
-            json.dump(d, f, skipkeys=False, ensure_ascii=False, indent=4, )
-        if(os.path.exists(p)):
-            os.remove(p)
-        shutil.move("{0}.tmp".format(p), p)
-        return p
+    def _abort(self):
+        """Stop anything left running after failed export."""
+        if(self.pipeline is not None):
+            self.pipeline.abort()
+            self.pipeline = None
+        # unfinished intermediates
+        if(hasattr(self, 'pack')):
+            self.pack.abort()
+        if(hasattr(self, 'scene_data')):
+            self.scene_data.abort()
     
     def _pymaxwell(self, append=False, ):
         # generate script
@@ -1953,26 +1994,12 @@ class MXSExport():
         rm(self.script_path)
         rm(self.scene_data_path)
         
-        if(hasattr(self, 'mesh_data_paths')):
-            for p in self.mesh_data_paths:
-                rm(p)
-        
-        if(hasattr(self, 'wire_base_data')):
-            rm(self.wire_base_data)
-            for p in self.wire_data_paths:
-                rm(p)
-        
-        if(hasattr(self, 'hair_data_paths')):
-            for p in self.hair_data_paths:
-                rm(p)
-        
-        if(hasattr(self, 'part_data_paths')):
-            for p in self.part_data_paths:
-                rm(p)
-        
-        if(hasattr(self, 'wire_data_paths')):
-            for p in self.wire_data_paths:
-                rm(p)
+        if(hasattr(self, 'pack')):
+            rm(self.pack.path)
+            # left behind when pack was not closed
+            p = "{0}.tmp".format(self.pack.path)
+            if(os.path.exists(p)):
+                os.remove(p)
         
         if(os.path.exists(self.tmp_dir)):
             os.rmdir(self.tmp_dir)
@@ -2081,6 +2108,10 @@ class MXSMotionBlurHelper():
     sub = 0
     off = 0.0
     ang = 360
+    # {(object, (frame, subframe)): matrix_world, }
+    samples = {}
+    # {(object, (frame, subframe)): (topology, vertices, normals), }
+    buffers = {}
     
     @classmethod
     def init(cls, camera, ):
@@ -2183,6 +2214,69 @@ class MXSMotionBlurHelper():
         
         return frames, fs
     
+    @classmethod
+    def sample(cls, objects, deformed, ):
+        """Move timeline once for each substep needed by any object and capture what objects will need at that substep.
+        Objects then don't have to move timeline for themselves, which evaluates whole scene for each object and substep.
+        objects     list of objects, world matrices of objects with movement and their parents are captured
+        deformed    list of objects, vertex locations and normals of objects with deformation are captured, first position
+                    is converted completely by object itself, evaluated meshes are removed right after reading
+        """
+        if(not cls.motion_blur or cls.camera is None):
+            return
+        
+        requests = {}
+        
+        def request(ob, steps, deform, ):
+            for s in steps:
+                if(s not in requests):
+                    requests[s] = []
+                requests[s].append((ob, deform, ))
+        
+        for ob in objects:
+            if(ob.maxwell_render.movement):
+                steps = cls.object_steps(ob)
+                if(len(steps) > 1):
+                    request(ob, steps, False, )
+        for ob in deformed:
+            if(ob.maxwell_render.deformation):
+                if(ob.type == 'MESH' and ob.data.use_auto_smooth):
+                    # split normals, all positions are converted completely
+                    continue
+                steps = cls.object_steps(ob)
+                request(ob, steps[1:], True, )
+        
+        if(len(requests) == 0):
+            return
+        
+        sc = cls.sc
+        cf = sc.frame_current
+        sf = sc.frame_subframe
+        for step in sorted(requests.keys()):
+            frame, sub = step
+            sc.frame_set(frame, subframe=sub, )
+            for ob, deform in requests[step]:
+                if(deform):
+                    me, _ = MXSMesh._to_mesh(ob)
+                    cls.buffers[(ob, step, )] = MXSMesh._vertex_buffers(me)
+                    bpy.data.meshes.remove(me)
+                else:
+                    for o in (ob, ob.parent, ):
+                        if(o is not None and (o, step, ) not in cls.samples):
+                            cls.samples[(o, step, )] = o.matrix_world.copy()
+        sc.frame_set(cf, subframe=sf, )
+        log("motion blur: sampled {} substeps".format(len(requests)), 2, )
+    
+    @classmethod
+    def matrix(cls, ob, step, ):
+        """Return matrix_world of object at (frame, subframe) or None if not sampled."""
+        return cls.samples.get((ob, step, ))
+    
+    @classmethod
+    def vertex_buffers(cls, ob, step, ):
+        """Return (topology, vertices, normals) of object at (frame, subframe) or None if not sampled, buffers are forgotten."""
+        return cls.buffers.pop((ob, step, ), None)
+    
     @classmethod
     def clear(cls):
         cls.sc = None
@@ -2191,6 +2285,223 @@ class MXSMotionBlurHelper():
         cls.sub = 0
         cls.off = 0.0
         cls.ang = 360
+        cls.samples = {}
+        cls.buffers = {}
+
+
+class MXSMeshCache():
+    """Persistent on-disk cache of converted mesh data (vertices, normals, triangles, uvs and materials).
+    Key is sha1 of mesh datablock data and render settings of all modifiers, so unchanged meshes are not converted again
+    in next exports. Anything that might change result without changing mesh or modifier settings is not cached:
+    converted curves, deformation blur, shape keys, subdivision, custom split normals, vertex groups and modifiers
+    which use other objects or time.
+    
+    When exporting animation, converted data is also kept in memory from one frame to the next, so static meshes
+    are converted only once per animation and only changed meshes are converted again.
+    """
+    
+    store = None
+    animation = False
+    previous = {}
+    current = {}
+    # bump when converted data layout or conversion changes
+    version = 1
+    volatile_modifiers = ('ARMATURE', 'BUILD', 'CAST', 'CLOTH', 'COLLISION', 'CURVE', 'DYNAMIC_PAINT', 'EXPLODE', 'FLUID_SIMULATION',
+                          'HOOK', 'LATTICE', 'MESH_CACHE', 'MESH_DEFORM', 'MESH_SEQUENCE_CACHE', 'OCEAN', 'PARTICLE_INSTANCE',
+                          'PARTICLE_SYSTEM', 'SMOKE', 'SOFT_BODY', 'SURFACE', 'WAVE', )
+    
+    @classmethod
+    def init(cls):
+        sc = bpy.context.scene
+        mx = sc.maxwell_render
+        
+        cls.animation = (mx.exporting_animation_now and mx.export_animation_reuse_meshes)
+        if(cls.animation and sc.frame_current != sc.frame_start):
+            # keep only what was used in previous frame
+            cls.previous = cls.current
+        else:
+            cls.previous = {}
+        cls.current = {}
+        
+        if(not mx.export_mesh_cache):
+            return
+        d = utils.tmp_dir(purpose='mesh_cache', uid='cache', use_blend_name=True, )
+        cls.store = tmpio.MXSMeshCache(d, mx.export_mesh_cache_size * 1024 * 1024, )
+    
+    @classmethod
+    def key(cls, o, ):
+        """Return cache key for mesh object or None if it can't be cached."""
+        if(cls.store is None and not cls.animation):
+            return None
+        if(o['converted'] is True):
+            return None
+        
+        ob = o['object']
+        me = ob.data
+        mx = ob.maxwell_render
+        sc = bpy.context.scene
+        smx = sc.maxwell_render
+        
+        if(mx.deformation or mx.subdivision.enabled):
+            return None
+        if(me.shape_keys is not None or me.has_custom_normals):
+            return None
+        if(smx.export_use_subdivision and len(ob.modifiers) > 0 and ob.modifiers[-1].type == 'SUBSURF'):
+            return None
+        
+        h = hashlib.sha1()
+        
+        def value(v):
+            h.update(repr(v).encode('utf-8'))
+        
+        def array(c, a, n, dtype, ):
+            v = numpy.empty(len(c) * n, dtype=dtype, )
+            c.foreach_get(a, v)
+            h.update(v.tobytes())
+        
+        for m in ob.modifiers:
+            if(m.type in cls.volatile_modifiers):
+                return None
+            value(m.type)
+            for p in m.bl_rna.properties:
+                i = p.identifier
+                if(i == 'rna_type'):
+                    continue
+                v = getattr(m, i)
+                if(p.type == 'POINTER' or p.type == 'COLLECTION'):
+                    # result depends on other datablock
+                    if(v is not None and (p.type == 'POINTER' or len(v) > 0)):
+                        return None
+                    continue
+                if(p.type == 'STRING' and i.startswith('vertex_group') and v != ''):
+                    return None
+                if(p.type != 'STRING' and p.is_array):
+                    v = tuple(v)
+                if(isinstance(v, set)):
+                    # enum flags, set order is not stable between sessions
+                    v = tuple(sorted(v))
+                value((i, v, ))
+        
+        value((cls.version, smx.export_direct_tessellation, sc.render.use_simplify, sc.render.simplify_subdivision_render, ))
+        value((me.use_auto_smooth, me.auto_smooth_angle, len(me.vertices), len(me.edges), len(me.polygons), len(me.loops), ))
+        
+        array(me.vertices, 'co', 3, numpy.float32)
+        array(me.edges, 'vertices', 2, numpy.int32)
+        array(me.edges, 'use_edge_sharp', 1, bool)
+        array(me.edges, 'crease', 1, numpy.float32)
+        array(me.edges, 'bevel_weight', 1, numpy.float32)
+        array(me.polygons, 'loop_start', 1, numpy.int32)
+        array(me.polygons, 'loop_total', 1, numpy.int32)
+        array(me.polygons, 'material_index', 1, numpy.int32)
+        array(me.polygons, 'use_smooth', 1, bool)
+        array(me.loops, 'vertex_index', 1, numpy.int32)
+        for uv in me.uv_layers:
+            value(uv.name)
+            array(uv.data, 'uv', 2, numpy.float32)
+        
+        return h.hexdigest()
+    
+    @classmethod
+    def get(cls, key, ):
+        if(key is None):
+            return None
+        if(cls.animation):
+            d = cls.current.get(key)
+            if(d is None):
+                d = cls.previous.get(key)
+            if(d is not None):
+                log("unchanged since previous frame", 3, )
+                cls.current[key] = d
+                return d
+        if(cls.store is None):
+            return None
+        d = cls.store.get(key)
+        if(d is not None and cls.animation):
+            cls.current[key] = d
+        return d
+    
+    @classmethod
+    def put(cls, key, mesh, ):
+        if(key is None):
+            return
+        d = {'vertices': mesh.m_vertices[0],
+             'normals': mesh.m_normals[0],
+             'triangles': mesh.m_triangles,
+             'triangle_normals': mesh.m_triangle_normals[0],
+             'triangle_materials': mesh.m_triangle_materials, }
+        for i, uv in enumerate(mesh.m_uv_channels):
+            d['uv_{}'.format(i)] = uv
+        if(cls.animation):
+            cls.current[key] = d
+        if(cls.store is not None):
+            cls.store.put(key, d)
+    
+    @classmethod
+    def clear(cls):
+        # in-memory data from current frame stays for the next one
+        cls.store = None
+    
+    @classmethod
+    def release(cls):
+        cls.animation = False
+        cls.previous = {}
+        cls.current = {}
+
+
+class MXSWriterPipeline():
+    # number of objects waiting for writing, limits memory used by arrays made ahead
+    size = 16
+    
+    def __init__(self, write, ):
+        """Call write(o) for each object put() in worker thread, in the same order.
+        write       function, must not use blender api
+        """
+        self.write = write
+        self.queue = queue.Queue(maxsize=self.size)
+        self.done = 0
+        self.error = None
+        self.aborted = False
+        self.thread = threading.Thread(target=self._run, name=self.__class__.__name__, )
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def _run(self):
+        while(True):
+            o = self.queue.get()
+            if(o is None):
+                break
+            if(self.error is None and not self.aborted):
+                try:
+                    self.write(o)
+                except Exception:
+                    # keep taking objects so put() does not block, error is raised in main thread
+                    self.error = sys.exc_info()
+            self.done += 1
+    
+    def _raise(self):
+        if(self.error is not None):
+            _, e, tb = self.error
+            raise e.with_traceback(tb)
+    
+    def put(self, o, ):
+        self._raise()
+        # blocks when queue is full
+        self.queue.put(o)
+    
+    def close(self, tick=None, ):
+        """Wait for all objects to be written, call tick() while waiting."""
+        self.queue.put(None)
+        while(self.thread.is_alive()):
+            self.thread.join(0.1)
+            if(tick is not None):
+                tick()
+        self._raise()
+    
+    def abort(self):
+        """Drop remaining objects and let worker thread exit, do not wait for it."""
+        self.aborted = True
+        # worker skips writing now, so this blocks at most for one object currently written
+        self.queue.put(None)
 
 
 class Serializable():
@@ -2217,6 +2528,19 @@ class Serializable():
         return a
 
 
+class MXSPayload(Serializable):
+    def __init__(self, o, extra=(), ):
+        """Copy of exported object data without references to blender data, safe to pass to another thread.
+        o           Serializable
+        extra       names of other than m_ attributes needed for writing
+        """
+        super().__init__()
+        for k, v in o._dict().items():
+            setattr(self, k, v)
+        for k in extra:
+            setattr(self, k, getattr(o, k))
+
+
 class MXSScene(Serializable):
     def __init__(self, mxs_path, groups, ):
         super().__init__()
@@ -2841,21 +3165,33 @@ class MXSObject(Serializable):
                     raise Exception("What's that? Something, somewhere is missing..")
             else:
                 position = 0
-            
+                moved = False
+                
                 for i, (frame, sub) in enumerate(steps):
-                    # move timeline
-                    sc.frame_set(frame, subframe=sub, )
+                    mw = MXSMotionBlurHelper.matrix(self.b_object, (frame, sub), )
+                    pw = None
+                    if(self.b_parent):
+                        # parent used here is not always object's parent, look it up separately
+                        pw = MXSMotionBlurHelper.matrix(self.b_parent, (frame, sub), )
+                    if(mw is None or (self.b_parent and pw is None)):
+                        # not sampled in advance, move timeline
+                        sc.frame_set(frame, subframe=sub, )
+                        moved = True
+                        mw = self.b_object.matrix_world
+                        if(self.b_parent):
+                            pw = self.b_parent.matrix_world
                     # base / pivot
-                    m = self.b_object.matrix_world.copy()
+                    m = mw.copy()
                     if(self.b_parent):
-                        m = self.b_parent.matrix_world.copy().inverted() * m
+                        m = pw.copy().inverted() * m
                     m *= ROTATE_X_90
                     b, p, l, r, s = self._matrix_to_base_and_pivot(m)
                     self.m_motion_blur.append((sub, position, b, p))
-                
+                    
                     log("movement: frame: {}, step: {}".format(frame, round(sub, 6)), 3, )
-            
-                sc.frame_set(cf, subframe=sf, )
+                
+                if(moved):
+                    sc.frame_set(cf, subframe=sf, )
         else:
             self.m_motion_blur = []
     
@@ -2978,9 +3314,31 @@ class MXSMesh(MXSObject):
                 else:
                     raise Exception("What's that? Something, somewhere is missing..")
             else:
+                moved = False
                 for position, (frame, sub) in enumerate(steps):
-                    # move timeline
-                    sc.frame_set(frame, subframe=sub, )
+                    b = None
+                    if(position > 0):
+                        b = MXSMotionBlurHelper.vertex_buffers(self.b_object, (frame, sub), )
+                    
+                    if(position > 0 and self.topology is not None):
+                        # only vertex locations and normals, triangles, uvs and materials are the same as in first position
+                        if(b is None):
+                            # not sampled in advance, move timeline
+                            sc.frame_set(frame, subframe=sub, )
+                            moved = True
+                            me = self._evaluate(pos=position, )[0]
+                            b = self._vertex_buffers(me)
+                            bpy.data.meshes.remove(me)
+                        if(self._deformed_to_data(b, position, len(steps), )):
+                            log("deformation: frame: {}, step: {}, position: {}".format(frame, round(sub, 6), position), 3, )
+                            continue
+                        log("'{}': topology is changing between deformation steps, deformation blur might not work".format(self.b_object.name), 3, LogStyles.WARNING, )
+                        self.topology = None
+                    
+                    if(sc.frame_current != frame or sc.frame_subframe != sub):
+                        sc.frame_set(frame, subframe=sub, )
+                        moved = True
+                    
                     # mesh
                     me = self._prepare_mesh(pos=position, )
                     
@@ -2993,15 +3351,212 @@ class MXSMesh(MXSObject):
                     
                     bpy.data.meshes.remove(me)
                 
-                sc.frame_set(cf, subframe=sf, )
+                if(moved):
+                    sc.frame_set(cf, subframe=sf, )
         else:
-            me = self._prepare_mesh()
-            # self._mesh_to_data(me)
-            self._mesh_to_data2(me)
-            
-            self._materials()
-            # cleanup
-            bpy.data.meshes.remove(me)
+            key = MXSMeshCache.key(self.o)
+            d = MXSMeshCache.get(key)
+            if(d is not None):
+                log("mesh cache: {}".format(key), 3, )
+                self._cached_to_data(d)
+                self._materials()
+            else:
+                me = self._prepare_mesh()
+                # self._mesh_to_data(me)
+                self._mesh_to_data2(me)
+                MXSMeshCache.put(key, self)
+                
+                self._materials()
+                # cleanup
+                bpy.data.meshes.remove(me)
+    
+    def _release(self):
+        """Drop geometry arrays after mesh is written, names and everything else stays."""
+        self.m_vertices = []
+        self.m_normals = []
+        self.m_triangles = None
+        self.m_triangle_normals = []
+        self.m_uv_channels = None
+        self.m_triangle_materials = None
+        self.deformed_vertices = None
+        self.deformed_normals = None
+    
+    def _geometry_hash(self):
+        """Return sha1 of converted geometry and materials or None if mesh can't be shared with instances."""
+        if(self.m_num_positions != 1 or self.subdivision_modifier is not None):
+            return None
+        ob = self.b_object
+        mx = ob.maxwell_render
+        if(mx.subdivision.enabled or mx.scatter.enabled or mx.grass.enabled or mx.sea.enabled):
+            # maxwell modifier extensions are applied to object by name, it has to stay real mesh
+            return None
+        for ps in ob.particle_systems:
+            if(ps.settings.maxwell_render.use == 'CLONER'):
+                # cloner emitter
+                return None
+        for ps in bpy.data.particles:
+            if(ps.maxwell_render.use == 'CLONER' and ps.dupli_object == ob):
+                # cloner extension is applied to cloned object
+                return None
+        h = hashlib.sha1()
+        ls = [self.m_vertices[0], self.m_normals[0], self.m_triangles, self.m_triangle_normals[0], self.m_triangle_materials, ]
+        for a in ls + list(self.m_uv_channels):
+            a = numpy.ascontiguousarray(a)
+            h.update(repr((a.dtype.str, a.shape, )).encode('utf-8'))
+            h.update(a.tobytes())
+        # multi material instances inherit materials from base
+        h.update(repr((self.m_num_materials, self.m_materials, )).encode('utf-8'))
+        return h.hexdigest()
+    
+    def _cached_to_data(self, d, ):
+        # the same what _prepare_mesh and _mesh_to_data2 would set for non-deformed mesh without subdivision
+        self.mesh_name = self.b_object.data.name
+        self.quad_pairs = None
+        self.subdivision_modifier = None
+        
+        self.m_num_positions = 1
+        self.m_vertices = [d['vertices'], ]
+        self.m_normals = [d['normals'], ]
+        self.m_triangles = d['triangles']
+        self.m_triangle_normals = [d['triangle_normals'], ]
+        n = len([k for k in d.keys() if k.startswith('uv_')])
+        self.m_uv_channels = [d['uv_{}'.format(i)] for i in range(n)]
+        self.m_triangle_materials = d['triangle_materials']
+    
+    @staticmethod
+    def _to_mesh(ob, ):
+        """Make new flattened mesh from object at current frame, return (mesh, True if last modifier is exported as subdivision modifier)."""
+        extra_subdiv = False
+        use_subdivision = bpy.context.scene.maxwell_render.export_use_subdivision
+        if(use_subdivision):
+            if(len(ob.modifiers) > 0):
+                last_modifier = ob.modifiers[-1]
+                if(last_modifier.type == 'SUBSURF' and last_modifier.show_render and last_modifier.subdivision_type == 'CATMULL_CLARK'):
+                    extra_subdiv = True
+                    # if using auto subdivision modifiers in Maxwell, disable last modifier if conditions are met
+                    last_modifier.show_render = False
+                else:
+                    if(last_modifier.type == 'SUBSURF'):
+                        log("'{}': (auto subdivision modifiers) last subdivision modifier can't be used".format(ob.name), 3, LogStyles.WARNING, )
+        
+        # regular meshes, with modifiers applied
+        me = ob.to_mesh(bpy.context.scene, True, 'RENDER', )
+        
+        if(extra_subdiv):
+            # and enable it again
+            last_modifier.show_render = True
+        
+        return me, extra_subdiv
+    
+    def _evaluate(self, pos=0, ):
+        """Return (mesh, extra_subdiv) of object at given deformation position."""
+        if(self.o['converted'] is True and pos == 0):
+            # get to-mesh-conversion result (curves, texts, etc..)
+            return self.o['mesh'], False
+        return self._to_mesh(self.b_object)
+    
+    @staticmethod
+    def _topology(me, ):
+        # cheap check that two meshes have the same vertices and polygons
+        vs = numpy.empty(len(me.loops), dtype=numpy.int32, )
+        me.loops.foreach_get('vertex_index', vs)
+        return (len(me.vertices), len(me.polygons), len(me.loops), zlib.crc32(vs.tobytes()), )
+    
+    @staticmethod
+    def _vertex_buffers(me, ):
+        """Return (topology, vertices, normals) of deformed mesh, locations and normals are (n, 3) float32 arrays. Mesh is transformed in place."""
+        me.transform(ROTATE_X_MINUS_90)
+        me.calc_normals()
+        l = len(me.vertices)
+        # blender stores floats as 32bit
+        vs = numpy.empty((l * 3), dtype=numpy.float32, )
+        me.vertices.foreach_get('co', vs)
+        ns = numpy.empty((l * 3), dtype=numpy.float32, )
+        me.vertices.foreach_get('normal', ns)
+        return (MXSMesh._topology(me), vs.reshape((l, 3)), ns.reshape((l, 3)), )
+    
+    def _deformed_to_data(self, buffers, position, num_positions, ):
+        """Add vertex locations and normals of deformed mesh as next position, return False if topology is not the same as in first position.
+        buffers         (topology, vertices, normals) from _vertex_buffers()
+        position        int
+        num_positions   int
+        """
+        topology, bv, bn = buffers
+        if(topology != self.topology):
+            return False
+        
+        np = numpy
+        l = len(bv)
+        if(position == 1):
+            # all positions in preallocated arrays, first one is already converted
+            self.deformed_vertices = np.empty((num_positions, l, 3), dtype=np.float64, )
+            self.deformed_normals = np.empty((num_positions, l, 3), dtype=np.float64, )
+            self.deformed_vertices[0] = self.m_vertices[0]
+            self.deformed_normals[0] = self.m_normals[0]
+            self.m_vertices = [self.deformed_vertices[0], ]
+            self.m_normals = [self.deformed_normals[0], ]
+        
+        vs = self.deformed_vertices[position]
+        vs[:] = bv
+        ns = self.deformed_normals[position]
+        ns[:] = bn
+        
+        # flat triangle normals from new vertex locations
+        ts = self.m_triangles
+        a = vs[ts[:, 0]]
+        tn = np.cross(vs[ts[:, 1]] - a, vs[ts[:, 2]] - a)
+        d = np.sqrt((tn * tn).sum(axis=1)).reshape((-1, 1))
+        d[d == 0.0] = 1.0
+        tn /= d
+        
+        self.m_num_positions += 1
+        self.m_vertices.append(vs)
+        self.m_normals.append(ns)
+        self.m_triangle_normals.append(tn)
+        return True
+    
+    def _quad_pairs(self, quads, faces, ):
+        """Return (n, 2) int array of triangle pairs made from the same quad.
+        quads       list of vertex index lists of faces before triangulation, empty list for non-quads
+        faces       list of vertex index lists of faces after triangulation
+        """
+        # triangle made from quad uses 3 of its 4 vertices, map all sorted vertex triples of all quads to quad index
+        lookup = {}
+        for qi, q in enumerate(quads):
+            if(len(q) != 4):
+                continue
+            a, b, c, d = q
+            for t in ((a, b, c), (a, b, d), (a, c, d), (b, c, d), ):
+                k = tuple(sorted(t))
+                if(k not in lookup):
+                    lookup[k] = [qi, ]
+                else:
+                    lookup[k].append(qi)
+        
+        # triangles of each quad
+        pairs = {}
+        for fi, f in enumerate(faces):
+            if(len(f) != 3):
+                continue
+            for qi in lookup.get(tuple(sorted(f)), ()):
+                if(qi not in pairs):
+                    pairs[qi] = [fi, ]
+                else:
+                    pairs[qi].append(fi)
+        
+        r = []
+        bad = 0
+        for qi in sorted(pairs.keys()):
+            v = pairs[qi]
+            if(len(v) > 2):
+                bad += 1
+                v = v[:2]
+            if(len(v) == 2):
+                r.append(v)
+        if(bad > 0):
+            log("{}: triangulation result is non-manifold, Catmull-Clark subdivision will not work".format(self.b_object.name), 3, LogStyles.WARNING, )
+        
+        return numpy.array(r, dtype=numpy.int32, ).reshape((-1, 2))
     
     def _prepare_mesh(self, pos=0, ):
         ob = self.b_object
@@ -3010,41 +3565,39 @@ class MXSMesh(MXSObject):
         
         self.mesh_name = ob.data.name
         
-        extra_subdiv = False
-        
-        if(o['converted'] is True and pos == 0):
-            # get to-mesh-conversion result (curves, texts, etc..)
-            me = o['mesh']
-        else:
-            use_subdivision = bpy.context.scene.maxwell_render.export_use_subdivision
-            if(use_subdivision):
-                if(len(ob.modifiers) > 0):
-                    last_modifier = ob.modifiers[-1]
-                    if(last_modifier.type == 'SUBSURF' and last_modifier.show_render and last_modifier.subdivision_type == 'CATMULL_CLARK'):
-                        extra_subdiv = True
-                        # if using auto subdivision modifiers in Maxwell, disable last modifier if conditions are met
-                        last_modifier.show_render = False
-                    else:
-                        if(last_modifier.type == 'SUBSURF'):
-                            log("'{}': (auto subdivision modifiers) last subdivision modifier can't be used".format(ob.name), 3, LogStyles.WARNING, )
-            
-            # or make new flattened mesh (regular meshes, with modifiers applied)
-            me = ob.to_mesh(bpy.context.scene, True, 'RENDER', )
-            
-            if(extra_subdiv):
-                # and enable it again
-                last_modifier.show_render = True
+        me, extra_subdiv = self._evaluate(pos=pos, )
         
         # transform
         me.transform(ROTATE_X_MINUS_90)
         
         # here, in triangulating, i experienced crash from not so well mesh, validating before prevents it..
-        me.validate()
+        broken = me.validate()
+        
+        subd = ob.maxwell_render.subdivision
+        if(pos == 0):
+            # topology of first position, deformation positions with the same topology reuse triangulation
+            self.topology = None
+            if(not broken and not me.use_auto_smooth):
+                self.topology = self._topology(me)
+            
+            # decide on first position only, all deformation positions have to be triangulated the same way
+            self.direct_tessellation = False
+            if(bpy.context.scene.maxwell_render.export_direct_tessellation):
+                # quad pairs for subdivision and split normals need bmesh triangulated polygons
+                if(not broken and not me.use_auto_smooth and not ((subd.enabled and subd.scheme == '0') or extra_subdiv)):
+                    self.direct_tessellation = True
+        
+        if(self.direct_tessellation):
+            # read blender's own tessellation in _mesh_to_data2, skip bmesh round-trip
+            self.quad_pairs = None
+            self.subdivision_modifier = None
+            me.calc_tessface()
+            me.calc_normals()
+            return me
         
         bm = bmesh.new()
         bm.from_mesh(me)
         # store quads if needed
-        subd = ob.maxwell_render.subdivision
         # do this only when subdivision is enabled and set to catmull-clark scheme
         if((subd.enabled and subd.scheme == '0') or extra_subdiv):
             # make list if vertex indices lists, only for quads, for other polygons put empty list
@@ -3103,32 +3656,9 @@ class MXSMesh(MXSObject):
         quad_pairs = None
         # do this only when subdivision is enabled and set to catmull-clark scheme
         if((subd.enabled and subd.scheme == '0') or extra_subdiv):
-            quadix = []
-            for f in bm.faces:
-                vixs = [v.index for v in f.verts]
-                for qi, q in enumerate(fvixs):
-                    c = 0
-                    for i in q:
-                        if(i in vixs):
-                            c += 1
-                        if(c == 3):
-                            # has 3 verts from ex-quad, is one of the pair
-                            quadix.append([qi, f.index])
-                            break
-            # make pairs
-            quadd = {}
-            for qi, fi in quadix:
-                if(str(qi) not in quadd):
-                    quadd[str(qi)] = [fi, ]
-                else:
-                    quadd[str(qi)].append(fi)
-            # quad pairs dict to list
-            quad_pairs = []
-            for k, v in quadd.items():
-                if(len(v) > 2):
-                    log("{}: triangulation result is non-manifold, Catmull-Clark subdivision will not work".format(ob.name), 3, LogStyles.WARNING, )
-                    v = v[:2]
-                quad_pairs.append(v)
+            # face indices in the same order as bm.to_mesh() will write them
+            bm.faces.index_update()
+            quad_pairs = self._quad_pairs(fvixs, [[v.index for v in f.verts] for f in bm.faces], )
         
         self.quad_pairs = quad_pairs
         
@@ -3142,6 +3672,7 @@ class MXSMesh(MXSObject):
         
         self.subdivision_modifier = None
         if(extra_subdiv):
+            last_modifier = ob.modifiers[-1]
             sd = self.b_object.maxwell_render.subdivision
             # store old settings
             old = (sd.enabled, sd.level, sd.scheme, sd.interpolation, sd.crease, sd.smooth, )
@@ -3222,45 +3753,56 @@ class MXSMesh(MXSObject):
     def _mesh_to_data2(self, me, ):
         import numpy as np
         
+        # blender stores floats and ints as 32bit, foreach_get copies raw data at once only into arrays of matching type
+        f4 = np.float32
+        i4 = np.int32
+        
         def verts(me):
             l = len(me.vertices)
-            vs = np.zeros((l * 3), dtype=np.float, )
-            ns = np.zeros((l * 3), dtype=np.float, )
+            vs = np.empty((l * 3), dtype=f4, )
+            ns = np.empty((l * 3), dtype=f4, )
             me.vertices.foreach_get('co', vs)
             me.vertices.foreach_get('normal', ns)
-            return (np.reshape(vs, (l, 3), ),
-                    np.reshape(ns, (l, 3), ), )
+            return (vs.reshape((l, 3)).astype(np.float64),
+                    ns.reshape((l, 3)).astype(np.float64), )
+        
+        def materials(faces, l):
+            # (face index, material index), face index is the same as position in collection
+            ms = np.empty(l, dtype=i4, )
+            faces.foreach_get('material_index', ms)
+            r = np.empty((l, 2), dtype=i4, )
+            r[:, 0] = np.arange(l, dtype=i4, )
+            r[:, 1] = ms
+            return r
+        
+        def face_vertices(faces, l):
+            # (3x vertex index, 3x normal index), normal indices are filled by caller
+            vs = np.empty((l * 3), dtype=i4, )
+            faces.foreach_get('vertices', vs)
+            ts = np.empty((l, 6), dtype=i4, )
+            ts[:, :3] = vs.reshape((l, 3))
+            return ts
+        
+        def loop_normals(me):
+            ll = len(me.loops)
+            lns = np.empty((ll * 3), dtype=f4, )
+            me.loops.foreach_get('normal', lns)
+            return lns.reshape((ll, 3)).astype(np.float64)
         
         def triangles(me):
             l = len(me.polygons)
-            ts = np.zeros((l * 3), dtype=np.int, )
-            ns = np.zeros((l * 3), dtype=np.float, )
-            ms = np.zeros(l, dtype=np.int, )
-            fs = np.zeros(l, dtype=np.int, )
-            me.polygons.foreach_get('vertices', ts)
-            me.polygons.foreach_get('normal', ns)
-            me.polygons.foreach_get('material_index', ms)
-            me.polygons.foreach_get('use_smooth', fs)
-            
             vl = len(me.vertices)
-            ni = np.arange(vl, vl + l, dtype=np.int, )
-            ni = np.reshape(ni, (-1, 1))
-            ni = np.concatenate((ni, ni, ni), axis=1)
-            
-            # smooth faces > use vertex normals
-            ts = np.reshape(ts, (l, 3))
-            for i, b in enumerate(fs):
-                if(b):
-                    # same indices as vertex locations, so just copy that
-                    ni[i] = ts[i]
-            
-            ts = np.concatenate((ts, ni), axis=1)
-            
-            ti = np.zeros(l, dtype=np.int, )
-            me.polygons.foreach_get('index', ti)
-            ti = np.reshape(ti, (-1, 1))
-            ms = np.reshape(ms, (-1, 1))
-            ms = np.concatenate((ti, ms), axis=1)
+            ts = face_vertices(me.polygons, l)
+            # flat faces > use face normals, stored after vertex normals
+            ts[:, 3:] = np.arange(vl, vl + l, dtype=i4, ).reshape((-1, 1))
+            # smooth faces > use vertex normals, same indices as vertex locations, so just copy that
+            fs = np.zeros(l, dtype=bool, )
+            me.polygons.foreach_get('use_smooth', fs)
+            ts[fs, 3:] = ts[fs, :3]
+            ns = np.empty((l * 3), dtype=f4, )
+            me.polygons.foreach_get('normal', ns)
+            ns = ns.reshape((l, 3)).astype(np.float64)
+            ms = materials(me.polygons, l)
             
             # FIXME: disabled Subdivision until fixed
             '''
@@ -3334,142 +3876,124 @@ class MXSMesh(MXSObject):
             # warning: ugly hacking ends here..
             '''
             
-            return (ts, np.reshape(ns, (l, 3)), ms, )
+            return (ts, ns, ms, )
         
         def triangles1(me):
             l = len(me.polygons)
-            ts = np.zeros((l * 3), dtype=np.int, )
-            ns = np.zeros((l * 3), dtype=np.float, )
-            ms = np.zeros(l, dtype=np.int, )
-            fs = np.zeros(l, dtype=np.int, )
-            me.polygons.foreach_get('vertices', ts)
-            me.polygons.foreach_get('normal', ns)
-            me.polygons.foreach_get('material_index', ms)
-            me.polygons.foreach_get('use_smooth', fs)
-            
-            vl = len(me.vertices)
-            ni = np.arange(vl, vl + l, dtype=np.int, )
-            ni = np.reshape(ni, (-1, 1))
-            ni = np.concatenate((ni, ni, ni), axis=1)
-            
-            # smooth faces > use vertex normals
-            ts = np.reshape(ts, (l, 3))
-            for i, b in enumerate(fs):
-                if(b):
-                    # same indices as vertex locations, so just copy that
-                    ni[i] = ts[i]
-            
-            ts = np.concatenate((ts, ni), axis=1)
-            
-            ti = np.zeros(l, dtype=np.int, )
-            me.polygons.foreach_get('index', ti)
-            ti = np.reshape(ti, (-1, 1))
-            ms = np.reshape(ms, (-1, 1))
-            ms = np.concatenate((ti, ms), axis=1)
-            
-            # return (ts, np.reshape(ns, (l, 3)), ms, )
+            vnn = len(me.vertices)
+            ts = face_vertices(me.polygons, l)
+            ms = materials(me.polygons, l)
             
             # split normals
             # TODO: remove old normals code and use face loop normals for everything or make a switch on mesh to use split normals or not (better solution i guess, and faster as well)
-            vnn = len(me.vertices)
-            ll = len(me.loops)
-            lns = np.zeros((ll * 3), dtype=np.float, )
-            me.loops.foreach_get('normal', lns)
-            lns = np.reshape(lns, (ll, 3))
-            sn = np.zeros((l, 3, 3), dtype=np.float, )
-            tsa = np.array(ts, copy=True)
-            for i, p in enumerate(me.polygons):
-                a = p.loop_start
-                b = a + p.loop_total
-                sn[p.index] = lns[a:b]
-                for j in range(3):
-                    tsa[i][j + 3] = vnn + a + j
-            
-            return (tsa, np.reshape(sn, (ll, 3)), ms)
+            lns = loop_normals(me)
+            # loop indices of each polygon
+            ls = np.empty(l, dtype=i4, )
+            me.polygons.foreach_get('loop_start', ls)
+            li = ls.reshape((-1, 1)) + np.arange(3, dtype=i4, )
+            ts[:, 3:] = vnn + li
+            sn = lns[li]
+            
+            return (ts, sn.reshape((-1, 3)), ms)
         
         def triangles2(me):
             l = len(me.polygons)
-            ts = np.zeros((l * 3), dtype=np.int, )
-            ms = np.zeros(l, dtype=np.int, )
-            me.polygons.foreach_get('vertices', ts)
-            me.polygons.foreach_get('material_index', ms)
-            
-            # normals
             vnn = len(me.vertices)
             ll = len(me.loops)
-            # loop indices
-            ni = np.arange(vnn, vnn + ll, 1, dtype=np.int, )
-            ni = np.reshape(ni, (l, 3))
-            ts = np.reshape(ts, (l, 3))
-            ts = np.concatenate((ts, ni), axis=1)
-            # loops normals
-            lns = np.zeros((ll * 3), dtype=np.float, )
-            me.loops.foreach_get('normal', lns)
-            sn = np.reshape(lns, (l, 3, 3))
-            
-            # materials
-            ti = np.zeros(l, dtype=np.int, )
-            me.polygons.foreach_get('index', ti)
-            ti = np.reshape(ti, (-1, 1))
-            ms = np.reshape(ms, (-1, 1))
-            ms = np.concatenate((ti, ms), axis=1)
-            
-            return (ts, np.reshape(sn, (ll, 3)), ms)
+            ts = face_vertices(me.polygons, l)
+            # loop indices, loops normals
+            ts[:, 3:] = np.arange(vnn, vnn + ll, dtype=i4, ).reshape((l, 3))
+            sn = loop_normals(me)
+            ms = materials(me.polygons, l)
+            return (ts, sn, ms)
         
         def triangles3(me):
             l = len(me.tessfaces)
-            ts = np.zeros((l * 3), dtype=np.int, )
-            ms = np.zeros(l, dtype=np.int, )
-            me.tessfaces.foreach_get('vertices', ts)
-            me.tessfaces.foreach_get('material_index', ms)
-            
-            # normals
             vnn = len(me.vertices)
             ll = len(me.loops)
-            # loop indices
-            ni = np.arange(vnn, vnn + ll, 1, dtype=np.int, )
-            ni = np.reshape(ni, (l, 3))
-            ts = np.reshape(ts, (l, 3))
-            ts = np.concatenate((ts, ni), axis=1)
-            # loops normals
-            lns = np.zeros((ll * 3), dtype=np.float, )
-            me.loops.foreach_get('normal', lns)
-            sn = np.reshape(lns, (l, 3, 3))
-            
-            # materials
-            ti = np.zeros(l, dtype=np.int, )
-            me.tessfaces.foreach_get('index', ti)
-            ti = np.reshape(ti, (-1, 1))
-            ms = np.reshape(ms, (-1, 1))
-            ms = np.concatenate((ti, ms), axis=1)
-            
-            return (ts, np.reshape(sn, (ll, 3)), ms)
+            ts = face_vertices(me.tessfaces, l)
+            # loop indices, loops normals
+            ts[:, 3:] = np.arange(vnn, vnn + ll, dtype=i4, ).reshape((l, 3))
+            sn = loop_normals(me)
+            ms = materials(me.tessfaces, l)
+            return (ts, sn, ms)
+        
+        def tessfaces(me):
+            # tessfaces are triangles and quads, quad (0, 1, 2, 3) is split to (0, 1, 2) and (0, 2, 3)
+            l = len(me.tessfaces)
+            vl = len(me.vertices)
+            vs = np.empty((l * 4), dtype=i4, )
+            me.tessfaces.foreach_get('vertices_raw', vs)
+            vs = vs.reshape((l, 4))
+            # fourth vertex index of triangle is 0, blender never puts vertex 0 at the end of quad
+            qs = np.flatnonzero(vs[:, 3])
+            # source tessface of each triangle
+            tf = np.concatenate((np.arange(l, dtype=i4, ), qs.astype(i4), ))
+            n = len(tf)
+            ts = np.empty((n, 6), dtype=i4, )
+            ts[:l, :3] = vs[:, :3]
+            ts[l:, 0] = vs[qs, 0]
+            ts[l:, 1] = vs[qs, 2]
+            ts[l:, 2] = vs[qs, 3]
+            # flat faces > use triangle normals, stored after vertex normals
+            ts[:, 3:] = np.arange(vl, vl + n, dtype=i4, ).reshape((-1, 1))
+            # smooth faces > use vertex normals
+            fs = np.zeros(l, dtype=bool, )
+            me.tessfaces.foreach_get('use_smooth', fs)
+            fs = fs[tf]
+            ts[fs, 3:] = ts[fs, :3]
+            ns = np.empty((l * 3), dtype=f4, )
+            me.tessfaces.foreach_get('normal', ns)
+            ns = ns.reshape((l, 3)).astype(np.float64)[tf]
+            mi = np.empty(l, dtype=i4, )
+            me.tessfaces.foreach_get('material_index', mi)
+            ms = np.empty((n, 2), dtype=i4, )
+            ms[:, 0] = np.arange(n, dtype=i4, )
+            ms[:, 1] = mi[tf]
+            return (ts, ns, ms, tf, qs, )
+        
+        def tessfaces_uvs(tuv, tf, qs):
+            # the same split as in tessfaces()
+            l = len(tuv.data)
+            uv = np.empty((l * 8), dtype=f4, )
+            tuv.data.foreach_get('uv_raw', uv)
+            uv = uv.reshape((l, 4, 2))
+            uv = np.concatenate((uv[:, :3], uv[qs][:, [0, 2, 3]], ))
+            r = np.zeros((len(tf), 3, 3), dtype=np.float64, )
+            r[:, :, 0] = uv[:, :, 0]
+            r[:, :, 1] = 1.0
+            r[:, :, 1] -= uv[:, :, 1]
+            return r.reshape((-1, 9))
         
         def tess_uvs(tuv):
             l = len(tuv.data)
-            e = 6
-            uv = np.zeros((l * e), dtype=np.float, )
+            uv = np.empty((l * 6), dtype=f4, )
             tuv.data.foreach_get('uv', uv)
-            uv = np.reshape(uv, (l * 3, 2), )
-            z = np.zeros((l * 3, 1), dtype=uv.dtype)
-            uv = np.c_[uv, z]
-            uv = np.reshape(uv, (l * 9), )
-            a = np.zeros(uv.shape, dtype=uv.dtype)
-            a[2 - 1::3] = 1.0
-            uv[2 - 1::3] = a[2 - 1::3] - uv[2 - 1::3]
-            r = np.reshape(uv, (l, 9), )
-            return r
+            uv = uv.reshape((l, 3, 2))
+            # (u, v, 0.0) for each corner
+            r = np.zeros((l, 3, 3), dtype=np.float64, )
+            r[:, :, 0] = uv[:, :, 0]
+            # flip v in double precision
+            r[:, :, 1] = 1.0
+            r[:, :, 1] -= uv[:, :, 1]
+            return r.reshape((l, 9))
         
         vertices, normals = verts(me)
-        if(me.use_auto_smooth):
-            triangles, triangle_normals, triangle_materials = triangles3(me)
-        else:
-            triangles, triangle_normals, triangle_materials = triangles(me)
-        
         uv_channels = []
-        for tix, uvtex in enumerate(me.tessface_uv_textures):
-            uv = tess_uvs(uvtex)
-            uv_channels.append(uv)
+        if(self.direct_tessellation):
+            triangles, triangle_normals, triangle_materials, tf, qs = tessfaces(me)
+            for tix, uvtex in enumerate(me.tessface_uv_textures):
+                uv = tessfaces_uvs(uvtex, tf, qs)
+                uv_channels.append(uv)
+        else:
+            if(me.use_auto_smooth):
+                triangles, triangle_normals, triangle_materials = triangles3(me)
+            else:
+                triangles, triangle_normals, triangle_materials = triangles(me)
+            
+            for tix, uvtex in enumerate(me.tessface_uv_textures):
+                uv = tess_uvs(uvtex)
+                uv_channels.append(uv)
         
         self.m_num_positions += 1
         self.m_vertices.append(vertices)
@@ -3786,7 +4310,7 @@ class MXSParticles(MXSObject):
                 cf = bpy.context.scene.frame_current
                 if(mxex.seq_limit):
                     # get frame number from defined range
-                    rng = [i for i in range(mxex.seq_start, mxex.seq_end + 1)]
+                    rng = range(mxex.seq_start, mxex.seq_end + 1)
                     try:
                         gf = rng[cf - 1]
                     except IndexError:
@@ -3804,8 +4328,10 @@ class MXSParticles(MXSObject):
                     if(re.match(fnm_re, fnm)):
                         bnm = fnm[:-10]
                         sqbp = os.path.join(dnm, "{}-{}.bin".format(bnm, str(gf).zfill(5)))
-                        if(os.path.exists(sqbp)):
-                            mxex.bin_filename = sqbp
+                        # directory is scanned once and reused for all frames and objects until it changes
+                        frames = rfbin.sequence_index(dnm).get(bnm, {})
+                        if(gf in frames):
+                            mxex.bin_filename = frames[gf]
                         else:
                             # skip if not found
                             log("cannot find .bin file for frame: {} at path: '{}'. skipping..".format(gf, sqbp), 3, LogStyles.WARNING, )
@@ -3957,7 +4483,8 @@ class MXSHair(MXSObject):
         steps = 2 ** ps.settings.render_step
         # steps = 2 ** ps.settings.render_step + 1
         num_curves = len(ps.particles) if len(ps.child_particles) == 0 else len(ps.child_particles)
-        points = []
+        # all curves, each has the same number of points
+        locs = numpy.empty((num_curves, steps, 3), dtype=numpy.float64, )
         for p in range(0, num_curves):
             seg_length = 1.0
             curve = []
@@ -3977,7 +4504,13 @@ class MXSHair(MXSObject):
                     v = mat * v
                     curve.append(v)
             
-            points.append(curve)
+            if(len(curve) == 0):
+                # no usable point, use curve root so padding below never reads uninitialized memory
+                curve.append(mat * (transform * ps.co_hair(o, p, 0)))
+            n = len(curve)
+            locs[p, :n] = curve
+            # fill gaps with last location, confirm it has no negative effect in rendering..
+            locs[p, n:] = locs[p, n - 1]
         
         if(mxex.uv_layer is not ""):
             uv_no = 0
@@ -4074,18 +4607,8 @@ class MXSHair(MXSObject):
         
         ps.set_resolution(bpy.context.scene, o, 'PREVIEW')
         
-        # fill gaps with last location, confirm it has no negative effect in rendering..
-        for l in points:
-            if(len(l) < steps):
-                e = [l[-1]] * (steps - len(l))
-                l.extend(e)
-        # flatten curves
-        points = [v for l in points for v in l]
-        # 3 float tuples from vectors
-        points = [v.to_tuple() for v in points]
-        # just list of floats
-        locs = [v for l in points for v in l]
-        # locs = [round(v, 6) for v in locs]
+        # just array of floats
+        locs = locs.reshape(-1)
         
         data = {'HAIR_MAJOR_VER': [1, 0, 0, 0],
                 'HAIR_MINOR_VER': [0, 0, 0, 0],
@@ -65,6 +65,71 @@ elif(s == 'Windows'):
         from pymaxwell import *
 
 
+def texture_key(d):
+    """Hashable key from texture parameters dict, nested dicts and lists are converted to tuples.
+    d   dict
+    """
+    if(type(d) is dict):
+        return tuple((k, texture_key(v)) for k, v in sorted(d.items()))
+    if(type(d) is list or type(d) is tuple):
+        return tuple(texture_key(v) for v in d)
+    return d
+
+
+def set_mesh_arrays(o, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, ):
+    """Fill mesh object made by createMesh() with geometry.
+    o                   CmaxwellObject
+    num_positions       int
+    vertices            (num_positions, n, 3) float array or list of (n, 3) float arrays, one per position
+    normals             the same as vertices
+    triangles           (n, 6) int array (3x vertex index, 3x normal index)
+    triangle_normals    the same as vertices
+    uv_channels         list of (n, 9) float arrays or None
+    
+    pymaxwell setters take one element at a time, so each array is converted to python values once, right before use,
+    bound methods are looked up once and single Cvector is reused for all vertices and normals.
+    """
+    def values(a):
+        if(type(a) is numpy.ndarray):
+            return a.tolist()
+        return a
+    
+    v = Cvector()
+    assign = v.assign
+    set_vertex = o.setVertex
+    set_normal = o.setNormal
+    # triangle normals are stored after vertex normals
+    an = len(normals[0])
+    for ip in range(num_positions):
+        vs = values(vertices[ip])
+        ns = values(normals[ip])
+        for i in range(len(vs)):
+            assign(*vs[i])
+            set_vertex(i, ip, v, )
+            assign(*ns[i])
+            set_normal(i, ip, v, )
+        del vs, ns
+        tns = values(triangle_normals[ip])
+        for i in range(len(tns)):
+            assign(*tns[i])
+            set_normal(an + i, ip, v, )
+        del tns
+    
+    set_triangle = o.setTriangle
+    ts = values(triangles)
+    for i in range(len(ts)):
+        set_triangle(i, *ts[i])
+    del ts
+    
+    if(uv_channels is not None):
+        set_uvw = o.setTriangleUVW
+        for iuv in range(len(uv_channels)):
+            uv = values(uv_channels[iuv])
+            for it in range(len(uv)):
+                set_uvw(it, iuv, *uv[it])
+            del uv
+
+
 def read_mxm_preview(path):
     import numpy
     s = Cmaxwell(mwcallback)
@@ -213,9 +278,17 @@ class MXSWriter():
             # write here directly, even though it is also part of scene data, but api change just for this is pointless..
             self.mxs.setPluginID(pid)
         
+        # name -> Cmaterial and name -> CmaxwellObject, None means it has to be read from scene first
+        self.materials = {}
+        self.objects = {}
+        # texture parameters key -> CtextureMap
+        self.textures = {}
+        self.mxparams_textures = {}
         if(append):
             log("appending to existing scene..", 2, prefix="* ", )
             self.mxs.readMXS(self.path)
+            self.materials = None
+            self.objects = None
         else:
             log("creating new scene..", 2, prefix="* ", )
         
@@ -233,6 +306,7 @@ class MXSWriter():
     
     def erase_unused_materials(self):
         self.mxs.eraseUnusedMaterials()
+        self.materials = None
     
     def set_base_and_pivot(self, o, matrix=None, motion=None, ):
         """Convert float tuples to Cbases and set to object.
@@ -345,49 +419,64 @@ class MXSWriter():
         if(d is None):
             return
         
-        t = CtextureMap()
-        t.setPath(d['path'])
-        v = Cvector2D()
-        v.assign(*d['repeat'])
-        t.scale = v
-        v = Cvector2D()
-        v.assign(*d['offset'])
-        t.offset = v
-        t.rotation = d['rotation']
-        t.uvwChannelID = d['channel']
-        t.uIsTiled = d['tile_method_type'][0]
-        t.vIsTiled = d['tile_method_type'][1]
-        t.uIsMirrored = d['mirror'][0]
-        t.vIsMirrored = d['mirror'][1]
-        t.invert = d['invert']
-        # t.doGammaCorrection = 0
-        t.useAbsoluteUnits = d['tile_method_units']
-        
-        t.normalMappingFlipRed = d['normal_mapping_flip_red']
-        t.normalMappingFlipGreen = d['normal_mapping_flip_green']
-        t.normalMappingFullRangeBlue = d['normal_mapping_full_range_blue']
-        
-        t.useAlpha = d['alpha_only']
-        t.typeInterpolation = d['interpolation']
-        t.saturation = d['saturation'] / 100
-        t.contrast = d['contrast'] / 100
-        t.brightness = d['brightness'] / 100
-        t.hue = d['hue'] / 180
-        t.clampMin = d['rgb_clamp'][0] / 255
-        t.clampMax = d['rgb_clamp'][1] / 255
-        t.useGlobalMap = d['use_global_map']
-        # t.cosA = 1.000000
-        # t.sinA = 0.000000
+        k = texture_key(d)
+        t = self.mxparams_textures.get(k)
+        if(t is None):
+            t = CtextureMap()
+            t.setPath(d['path'])
+            v = Cvector2D()
+            v.assign(*d['repeat'])
+            t.scale = v
+            v = Cvector2D()
+            v.assign(*d['offset'])
+            t.offset = v
+            t.rotation = d['rotation']
+            t.uvwChannelID = d['channel']
+            t.uIsTiled = d['tile_method_type'][0]
+            t.vIsTiled = d['tile_method_type'][1]
+            t.uIsMirrored = d['mirror'][0]
+            t.vIsMirrored = d['mirror'][1]
+            t.invert = d['invert']
+            # t.doGammaCorrection = 0
+            t.useAbsoluteUnits = d['tile_method_units']
+            
+            t.normalMappingFlipRed = d['normal_mapping_flip_red']
+            t.normalMappingFlipGreen = d['normal_mapping_flip_green']
+            t.normalMappingFullRangeBlue = d['normal_mapping_full_range_blue']
+            
+            t.useAlpha = d['alpha_only']
+            t.typeInterpolation = d['interpolation']
+            t.saturation = d['saturation'] / 100
+            t.contrast = d['contrast'] / 100
+            t.brightness = d['brightness'] / 100
+            t.hue = d['hue'] / 180
+            t.clampMin = d['rgb_clamp'][0] / 255
+            t.clampMax = d['rgb_clamp'][1] / 255
+            t.useGlobalMap = d['use_global_map']
+            # t.cosA = 1.000000
+            # t.sinA = 0.000000
+            self.mxparams_textures[k] = t
         ok = mxparams.setTextureMap(name, t)
         return mxparams
     
     def texture(self, d, ):
-        """Create CtextureMap from parameters
+        """Get CtextureMap from parameters, textures with identical parameters are created just once
         d   dict
         """
         if(d is None):
             return
         
+        k = texture_key(d)
+        t = self.textures.get(k)
+        if(t is None):
+            t = self._texture(d)
+            self.textures[k] = t
+        return t
+    
+    def _texture(self, d, ):
+        """Create CtextureMap from parameters
+        d   dict
+        """
         s = self.mxs
         
         t = CtextureMap()
@@ -724,6 +813,7 @@ class MXSWriter():
         t.addProceduralTexture(ch)
         a.textureMap = t
         r.setAttribute('color', a)
+        self._register_material(n, m)
         return m
     
     def material_default(self, n, ):
@@ -731,6 +821,7 @@ class MXSWriter():
         m = s.createMaterial(n)
         l = m.addLayer()
         b = l.addBSDF()
+        self._register_material(n, m)
         return m
     
     def material_external(self, d, ):
@@ -741,12 +832,14 @@ class MXSWriter():
         m = s.addMaterial(t)
         if(not d['embed']):
             m.setReference(1, p)
+        self._register_material(d['name'], m)
         return m
     
     def material_custom(self, d, ):
         s = self.mxs
         
         m = s.createMaterial(d['name'])
+        self._register_material(d['name'], m)
         d = d['data']
         
         def global_props(d, m):
@@ -1460,24 +1553,31 @@ class MXSWriter():
             m = self.material_custom(d)
         else:
             raise TypeError("Material '{}' {} is unknown type".format(d['name'], d['subtype']))
+        self._register_material(d['name'], m)
+        return m
+    
+    def _register_material(self, n, m, ):
+        """Remember created material by name, registry is rebuilt from scene on next lookup if it is not valid."""
+        if(self.materials is not None):
+            self.materials[n] = m
+    
+    def _scan_materials(self):
+        """Rebuild name -> Cmaterial registry from scene, needed only after loading existing scene or erasing materials."""
+        s = self.mxs
+        it = CmaxwellMaterialIterator()
+        o = it.first(s)
+        r = {}
+        while not o.isNull():
+            name = o.getName()
+            r[name] = s.getMaterial(name)
+            o = it.next()
+        self.materials = r
     
     def get_material(self, n, ):
         """get material by name from scene, if material is missing, create and return placeholder"""
-        def get_material_names(s):
-            it = CmaxwellMaterialIterator()
-            o = it.first(s)
-            l = []
-            while not o.isNull():
-                name = o.getName()
-                l.append(name)
-                o = it.next()
-            return l
-        
-        s = self.mxs
-        names = get_material_names(s)
-        m = None
-        if(n in names):
-            m = s.getMaterial(n)
+        if(self.materials is None):
+            self._scan_materials()
+        m = self.materials.get(n)
         if(m is None):
             # should not happen because i stopped changing material names.. but i leave it here
             m = self.material_placeholder()
@@ -1569,6 +1669,32 @@ class MXSWriter():
             c.setActive()
         return c
     
+    def _register_object(self, n, o, ):
+        """Remember created object by name, registry is rebuilt from scene on next lookup if it is not valid."""
+        if(self.objects is not None):
+            self.objects[n] = o
+    
+    def _scan_objects(self):
+        """Rebuild name -> CmaxwellObject registry from scene, needed only after loading existing scene."""
+        s = self.mxs
+        it = CmaxwellObjectIterator()
+        o = it.first(s)
+        r = {}
+        while not o.isNull():
+            name, _ = o.getName()
+            r[name] = s.getObject(name)
+            o = it.next()
+        self.objects = r
+    
+    def get_object(self, n, ):
+        """get object by name, objects not created by this writer are looked up in scene"""
+        if(self.objects is None):
+            self._scan_objects()
+        o = self.objects.get(n)
+        if(o is None):
+            o = self.mxs.getObject(n)
+        return o
+    
     def empty(self, name, matrix, motion, object_props=None, ):
         """Create empty object.
         name            string
@@ -1577,6 +1703,7 @@ class MXSWriter():
         """
         s = self.mxs
         o = s.createMesh(name, 0, 0, 0, 0, )
+        self._register_object(name, o)
         self.set_base_and_pivot(o, matrix, motion, )
         if(object_props is not None):
             self.set_object_props(o, *object_props)
@@ -1601,31 +1728,11 @@ class MXSWriter():
         """
         s = self.mxs
         o = s.createMesh(name, len(vertices[0]), len(normals[0]) + len(triangle_normals[0]), len(triangles), num_positions)
+        self._register_object(name, o)
         if(uv_channels is not None):
             for i in range(len(uv_channels)):
                 o.addChannelUVW(i)
-        # an = 0
-        for ip in range(num_positions):
-            an = 0
-            verts = vertices[ip]
-            norms = normals[ip]
-            for i, loc in enumerate(verts):
-                o.setVertex(i, ip, Cvector(*loc), )
-                o.setNormal(i, ip, Cvector(*norms[i]), )
-                an += 1
-        for ip in range(num_positions):
-            trinorms = triangle_normals[ip]
-            for i, nor in enumerate(trinorms):
-                o.setNormal(an + i, ip, Cvector(*nor), )
-        if(type(triangles) is not list):
-            # pymaxwell does not like numpy arrays.. Cvectors has no problems, but setTriangle does..
-            triangles = triangles.tolist()
-        for i, tri in enumerate(triangles):
-            o.setTriangle(i, *tri)
-        if(uv_channels is not None):
-            for iuv, uv in enumerate(uv_channels):
-                for it, t in enumerate(uv):
-                    o.setTriangleUVW(it, iuv, *t)
+        set_mesh_arrays(o, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, )
         
         self.set_base_and_pivot(o, matrix, motion, )
         if(object_props is not None):
@@ -1676,8 +1783,9 @@ class MXSWriter():
         backface_material   (string path, bool embed) or None
         """
         s = self.mxs
-        bo = s.getObject(instanced_name)
+        bo = self.get_object(instanced_name)
         o = s.createInstancement(name, bo)
+        self._register_object(name, o)
         
         self.set_base_and_pivot(o, matrix, motion, )
         if(object_props is not None):
@@ -1712,6 +1820,7 @@ class MXSWriter():
         """
         s = self.mxs
         o = s.createMesh(name, 0, 0, 0, 0, )
+        self._register_object(name, o)
         o.setReferencedScenePath(path)
         if(flags[0]):
             o.setReferencedOverrideFlags(FLAG_OVERRIDE_HIDE)
@@ -1739,11 +1848,10 @@ class MXSWriter():
         """Set hierarchy of all objects at once.
         tree    [(obj_name, parent_name or None, ), ..., ]
         """
-        s = self.mxs
         for on, pn, _ in tree:
             if(pn is not None):
-                o = s.getObject(on)
-                p = s.getObject(pn)
+                o = self.get_object(on)
+                p = self.get_object(pn)
                 o.setParent(p)
     
     def environment(self, env_type=None, sky_type=None, sky=None, dome=None, sun_type=None, sun=None, ibl=None, ):
@@ -2235,39 +2343,20 @@ class MXSWriter():
         groups      list of dicts: {'name': string, 'objects': list of strings, 'opaque': bool, }
         """
         s = self.mxs
-        
-        def get_material_names(s):
-            it = CmaxwellMaterialIterator()
-            o = it.first(s)
-            l = []
-            while not o.isNull():
-                name = o.getName()
-                l.append(name)
-                o = it.next()
-            return l
-    
-        def get_object_names(s):
-            it = CmaxwellObjectIterator()
-            o = it.first(s)
-            l = []
-            while not o.isNull():
-                name, _ = o.getName()
-                l.append(name)
-                o = it.next()
-            return l
-        
-        sobs = get_object_names(s)
-        smats = get_material_names(s)
+        if(self.objects is None):
+            self._scan_objects()
+        if(self.materials is None):
+            self._scan_materials()
         
         for a in groups:
             s.createCustomAlphaChannel(a['name'], a['opaque'])
             for n in a['objects']:
-                if(n in sobs):
-                    o = s.getObject(n)
+                if(n in self.objects):
+                    o = self.objects[n]
                     o.addToCustomAlpha(a['name'])
             for n in a['materials']:
-                if(n in smats):
-                    m = s.getMaterial(n)
+                if(n in self.materials):
+                    m = self.materials[n]
                     m.addToCustomAlpha(a['name'])
     
     def ext_particles(self, name, properties, matrix, motion=None, object_props=None, material=None, backface_material=None, ):
@@ -2347,6 +2436,7 @@ class MXSWriter():
         p.setFloat('Max Velocity', d['max_velocity'])
         
         o = s.createGeometryProceduralObject(name, p)
+        self._register_object(name, o)
         
         a, _ = o.addChannelUVW()
         o.generateCustomUVW(0, a)
@@ -2374,7 +2464,7 @@ class MXSWriter():
         pivot               ((3 float), (3 float), (3 float), (3 float))
         root_radius         float
         tip_radius          float
-        data                dict of extension data
+        data                dict of extension data, 'HAIR_POINTS' can be numpy array
         object_props        (bool hide, float opacity, tuple cid=(int, int, int), bool hcam, bool hcamsc, bool hgi, bool hrr, bool hzcp, ) or None
         display_percent     int
         display_max         int
@@ -2399,7 +2489,14 @@ class MXSWriter():
         c.yAxis = Cvector(0.0, 1.0, 0.0)
         c.zAxis = Cvector(0.0, 0.0, 1.0)
         
-        p.setFloatArray('HAIR_POINTS', list(data['HAIR_POINTS']), c)
+        points = data['HAIR_POINTS']
+        if(type(points) is numpy.ndarray):
+            # single conversion to python floats right before pymaxwell
+            points = points.reshape(-1).tolist()
+        else:
+            points = list(points)
+        p.setFloatArray('HAIR_POINTS', points, c)
+        del points
         p.setFloatArray('HAIR_NORMALS', list(data['HAIR_NORMALS']), c)
         
         if(data['HAIR_FLAG_ROOT_UVS'][0] == 1):
@@ -2416,6 +2513,7 @@ class MXSWriter():
             p.setDouble('Tip Radius', tip_radius)
         
         o = s.createGeometryProceduralObject(name, p)
+        self._register_object(name, o)
         
         if(extension == 'MaxwellHair'):
             a, _ = o.addChannelUVW()
@@ -2488,6 +2586,7 @@ class MXSWriter():
         p.setFloat('Damp Factor Against Wind', wind[4])
         
         o = s.createGeometryLoaderObject(name, p)
+        self._register_object(name, o)
         
         self.set_base_and_pivot(o, matrix, motion, )
         if(object_props is not None):
@@ -2528,6 +2627,7 @@ class MXSWriter():
             p.setFloat('Persistance', d[7])
         
         o = s.createGeometryProceduralObject(name, p)
+        self._register_object(name, o)
         
         self.set_base_and_pivot(o, matrix, motion, )
         if(object_props is not None):
@@ -2551,7 +2651,6 @@ class MXSWriter():
         material            (string path, bool embed) or None
         backface_material   (string path, bool embed) or None
         """
-        s = self.mxs
         e = self.mgr.createDefaultGeometryModifierExtension('MaxwellGrass')
         p = e.getExtensionData()
         
@@ -2609,7 +2708,7 @@ class MXSWriter():
         p.setUInt('Display Percent', properties['display_percent'])
         p.setUInt('Display Max. Blades', properties['display_max_blades'])
         
-        o = s.getObject(object_name)
+        o = self.get_object(object_name)
         o.applyGeometryModifierExtension(p)
         return o
     
@@ -2621,9 +2720,8 @@ class MXSWriter():
         interpolation   int     (0, "None"), (1, "Edges"), (2, "Edges And Corners"), (3, "Sharp")
         crease          float
         smooth          float
-        quads           [[int, int], ...] or None
+        quads           [[int, int], ...], numpy int array (n, 2) or None
         """
-        s = self.mxs
         e = self.mgr.createDefaultGeometryModifierExtension('SubdivisionModifier')
         p = e.getExtensionData()
         
@@ -2633,9 +2731,12 @@ class MXSWriter():
         p.setFloat('Crease', crease)
         p.setFloat('Smooth Angle', smooth_angle)
         
-        o = s.getObject(object_name)
+        o = self.get_object(object_name)
         
         if(scheme == 0 and quads is not None):
+            if(type(quads) is numpy.ndarray):
+                # pymaxwell does not like numpy ints
+                quads = quads.tolist()
             for t, q in quads:
                 o.setTriangleQuadBuddy(t, q)
         
@@ -2655,7 +2756,6 @@ class MXSWriter():
         display_percent             int
         display_max                 int
         """
-        s = self.mxs
         e = self.mgr.createDefaultGeometryModifierExtension('MaxwellScatter')
         p = e.getExtensionData()
         
@@ -2699,7 +2799,7 @@ class MXSWriter():
         p.setUInt('Display Percent', display_percent)
         p.setUInt('Display Max. Blades', display_max)
         
-        o = s.getObject(object_name)
+        o = self.get_object(object_name)
         o.applyGeometryModifierExtension(p)
         return o
     
@@ -2724,7 +2824,6 @@ class MXSWriter():
         display_percent     int
         display_max         int
         """
-        s = self.mxs
         e = self.mgr.createDefaultGeometryModifierExtension('MaxwellCloner')
         p = e.getExtensionData()
         
@@ -2762,38 +2861,31 @@ class MXSWriter():
         p.setUInt('Display Max. Particles', display_max)
         
         if(not render_emitter):
-            o = s.getObject(object_name)
+            o = self.get_object(object_name)
             o.setHide(True)
         
-        o = s.getObject(cloned_object)
+        o = self.get_object(cloned_object)
         o.applyGeometryModifierExtension(p)
         return o
     
     def wireframe_override_object_materials(self, clay_mat_name, wire_base_name, ):
-        s = self.mxs
-        
-        it = CmaxwellObjectIterator()
-        o = it.first(scene)
-        l = []
-        while not o.isNull():
-            name, _ = o.getName()
-            l.append(name)
-            o = it.next()
+        if(self.objects is None):
+            self._scan_objects()
+        clay = self.get_material(clay_mat_name)
         
-        for o in l:
+        for n, o in self.objects.items():
             # do not set material to wire base
-            if(o.getName()[0] != wire_base_name):
+            if(n != wire_base_name):
                 if(o.isInstance()[0] == 1):
                     instanced = o.getInstanced()
                     # do not set material to wire base instances
                     if(instanced.getName()[0] != wire_base_name):
-                        o.setMaterial(clay_mat_name)
+                        o.setMaterial(clay)
                 else:
-                    o.setMaterial(clay_mat_name)
+                    o.setMaterial(clay)
     
     def wireframe_zero_scale_base(self, wire_base_name):
-        s = self.mxs
-        o = s.getObject(wire_base_name)
+        o = self.get_object(wire_base_name)
         
         z = (0.0, 0.0, 0.0)
         b = Cbase()
@@ -2826,6 +2918,9 @@ class MXMWriter():
         
         self.path = path
         self.mxs = Cmaxwell(mwcallback)
+        self.materials = {}
+        self.textures = {}
+        self.mxparams_textures = {}
         
         self.mgr = CextensionManager.instance()
         self.mgr.loadAllExtensions()
@@ -2865,43 +2960,58 @@ class MXMWriter():
         if(d is None):
             return
         
-        t = CtextureMap()
-        t.setPath(d['path'])
-        v = Cvector2D()
-        v.assign(*d['repeat'])
-        t.scale = v
-        v = Cvector2D()
-        v.assign(*d['offset'])
-        t.offset = v
-        t.rotation = d['rotation']
-        t.uvwChannelID = d['channel']
-        t.uIsTiled = d['tile_method_type'][0]
-        t.vIsTiled = d['tile_method_type'][1]
-        t.uIsMirrored = d['mirror'][0]
-        t.vIsMirrored = d['mirror'][1]
-        t.invert = d['invert']
-        # t.doGammaCorrection = 0
-        t.useAbsoluteUnits = d['tile_method_units']
-        
-        t.normalMappingFlipRed = d['normal_mapping_flip_red']
-        t.normalMappingFlipGreen = d['normal_mapping_flip_green']
-        t.normalMappingFullRangeBlue = d['normal_mapping_full_range_blue']
-        
-        t.useAlpha = d['alpha_only']
-        t.typeInterpolation = d['interpolation']
-        t.saturation = d['saturation'] / 100
-        t.contrast = d['contrast'] / 100
-        t.brightness = d['brightness'] / 100
-        t.hue = d['hue'] / 180
-        t.clampMin = d['rgb_clamp'][0] / 255
-        t.clampMax = d['rgb_clamp'][1] / 255
-        t.useGlobalMap = d['use_global_map']
-        # t.cosA = 1.000000
-        # t.sinA = 0.000000
+        k = texture_key(d)
+        t = self.mxparams_textures.get(k)
+        if(t is None):
+            t = CtextureMap()
+            t.setPath(d['path'])
+            v = Cvector2D()
+            v.assign(*d['repeat'])
+            t.scale = v
+            v = Cvector2D()
+            v.assign(*d['offset'])
+            t.offset = v
+            t.rotation = d['rotation']
+            t.uvwChannelID = d['channel']
+            t.uIsTiled = d['tile_method_type'][0]
+            t.vIsTiled = d['tile_method_type'][1]
+            t.uIsMirrored = d['mirror'][0]
+            t.vIsMirrored = d['mirror'][1]
+            t.invert = d['invert']
+            # t.doGammaCorrection = 0
+            t.useAbsoluteUnits = d['tile_method_units']
+            
+            t.normalMappingFlipRed = d['normal_mapping_flip_red']
+            t.normalMappingFlipGreen = d['normal_mapping_flip_green']
+            t.normalMappingFullRangeBlue = d['normal_mapping_full_range_blue']
+            
+            t.useAlpha = d['alpha_only']
+            t.typeInterpolation = d['interpolation']
+            t.saturation = d['saturation'] / 100
+            t.contrast = d['contrast'] / 100
+            t.brightness = d['brightness'] / 100
+            t.hue = d['hue'] / 180
+            t.clampMin = d['rgb_clamp'][0] / 255
+            t.clampMax = d['rgb_clamp'][1] / 255
+            t.useGlobalMap = d['use_global_map']
+            # t.cosA = 1.000000
+            # t.sinA = 0.000000
+            self.mxparams_textures[k] = t
         ok = mxparams.setTextureMap(name, t)
         return mxparams
     
     def texture(self, d, ):
+        """Get CtextureMap from parameters, textures with identical parameters are created just once
+        d   dict
+        """
+        k = texture_key(d)
+        t = self.textures.get(k)
+        if(t is None):
+            t = self._texture(d)
+            self.textures[k] = t
+        return t
+    
+    def _texture(self, d, ):
         """Create CtextureMap from parameters
         d   dict
         """
@@ -3241,6 +3351,7 @@ class MXMWriter():
         t.addProceduralTexture(ch)
         a.textureMap = t
         r.setAttribute('color', a)
+        self._register_material(n, m)
         return m
     
     def material_default(self, n, ):
@@ -3248,6 +3359,7 @@ class MXMWriter():
         m = s.createMaterial(n)
         l = m.addLayer()
         b = l.addBSDF()
+        self._register_material(n, m)
         return m
     
     def material_external(self, d, ):
@@ -3258,12 +3370,14 @@ class MXMWriter():
         m = s.addMaterial(t)
         if(not d['embed']):
             m.setReference(1, p)
+        self._register_material(d['name'], m)
         return m
     
     def material_custom(self, d, ):
         s = self.mxs
         
         m = s.createMaterial(d['name'])
+        self._register_material(d['name'], m)
         d = d['data']
         
         def global_props(d, m):
@@ -3987,25 +4101,31 @@ class MXMWriter():
             m = self.material_custom(d)
         else:
             raise TypeError("Material '{}' {} is unknown type".format(d['name'], d['subtype']))
+        self._register_material(d['name'], m)
         return m
     
+    def _register_material(self, n, m, ):
+        """Remember created material by name, registry is rebuilt from scene on next lookup if it is not valid."""
+        if(self.materials is not None):
+            self.materials[n] = m
+    
+    def _scan_materials(self):
+        """Rebuild name -> Cmaterial registry from scene, needed only after loading existing scene or erasing materials."""
+        s = self.mxs
+        it = CmaxwellMaterialIterator()
+        o = it.first(s)
+        r = {}
+        while not o.isNull():
+            name = o.getName()
+            r[name] = s.getMaterial(name)
+            o = it.next()
+        self.materials = r
+    
     def get_material(self, n, ):
         """get material by name from scene, if material is missing, create and return placeholder"""
-        def get_material_names(s):
-            it = CmaxwellMaterialIterator()
-            o = it.first(s)
-            l = []
-            while not o.isNull():
-                name = o.getName()
-                l.append(name)
-                o = it.next()
-            return l
-        
-        s = self.mxs
-        names = get_material_names(s)
-        m = None
-        if(n in names):
-            m = s.getMaterial(n)
+        if(self.materials is None):
+            self._scan_materials()
+        m = self.materials.get(n)
         if(m is None):
             # should not happen because i stopped changing material names.. but i leave it here
             m = self.material_placeholder()
@@ -764,6 +764,8 @@ class SceneProperties(PropertyGroup):
     export_output_directory = StringProperty(name="Output Directory", subtype='DIR_PATH', default="//", description="Output directory for Maxwell scene (.MXS) file", )
     export_use_instances = BoolProperty(name="Use Instances", default=True, description="Convert multi-user mesh objects to instances", )
     export_keep_intermediates = BoolProperty(name="Keep Intermediates", default=False, description="Do not remove intermediate files used for scene export (usable only for debugging purposes)", )
+    export_intermediates_single_precision = BoolProperty(name="Single Precision Intermediates", default=False, description="Store intermediate mesh data as 32bit floats, smaller files, but less precise (Mac OS X only)", )
+    export_intermediates_compression = BoolProperty(name="Compress Intermediates", default=False, description="Compress intermediate mesh data, smaller files for slow disks, but more work for processor (Mac OS X only)", )
     
     export_open_with = EnumProperty(name="Open With", items=[('STUDIO', "Studio", ""), ('MAXWELL', "Maxwell", ""), ('NONE', "None", "")], default='STUDIO', description="After export, open in ...", )
     instance_app = BoolProperty(name="Open a new instance of application", default=False, description="Open a new instance of the application even if one is already running", )
@@ -784,6 +786,12 @@ class SceneProperties(PropertyGroup):
     
     export_remove_unused_materials = BoolProperty(name="Remove Unused Materials", default=False, description="Remove all materials that is not used by any object in scene. Might not work as intended in 3.1.99.9.", )
     export_use_subdivision = BoolProperty(name="Use Subdivision Modifiers", default=False, description="Export all Subdivision modifiers if they are Catmull-Clark type and at the end of modifier stack on regular mesh objects. Manually added Subdivision will override automatic one.", )
+    export_direct_tessellation = BoolProperty(name="Direct Triangulation", default=False, description="Read triangles directly from Blender tessellation, without BMesh triangulation. Faster and uses less memory on dense meshes. Invalid meshes, meshes with custom split normals and meshes with subdivision still use BMesh.", )
+    export_auto_instances = BoolProperty(name="Auto Instances", default=False, description="Export meshes with identical geometry and materials as instances of the first one, even if they do not share mesh data", )
+    export_pipelined = BoolProperty(name="Pipelined Writing", default=False, description="Write scene file in another thread while next objects are being prepared (Linux and Windows only)", )
+    export_mesh_cache = BoolProperty(name="Mesh Cache", default=False, description="Keep converted mesh data on disk and reuse it in next exports when mesh and its modifiers did not change. Meshes with deformation blur, shape keys, subdivision or modifiers depending on other objects or time are always converted.", )
+    export_mesh_cache_size = IntProperty(name="Cache Size (MB)", default=1024, min=16, max=65536, description="Maximum size of mesh cache on disk, least recently used meshes are removed first", )
+    export_animation_reuse_meshes = BoolProperty(name="Reuse Unchanged Meshes", default=False, description="When exporting animation, keep converted mesh data in memory and convert again only meshes that changed since previous frame. The same rules as for Mesh Cache apply to which meshes can be reused.", )
     
     exporting_animation_now = BoolProperty(default=False, options={'HIDDEN'}, )
     exporting_animation_frame_number = IntProperty(default=1, options={'HIDDEN'}, )
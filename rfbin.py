@@ -24,16 +24,43 @@ import string
 import time
 import datetime
 import math
+import mmap
+import collections
+import concurrent.futures
+
+import numpy
 
 import bpy
 from bpy.types import Operator
 from bpy_extras.io_utils import ExportHelper
-from bpy.props import StringProperty, FloatProperty, BoolProperty
+from bpy.props import StringProperty, FloatProperty, BoolProperty, IntProperty
 from mathutils import Matrix, Vector
 
 from .log import log, LogStyles
 
 
+# RealFlow v11 particle record, packed, native byte order, standard sizes, same as struct "=" format
+RFBIN_PARTICLE_DTYPE = numpy.dtype([('position', '=f4', (3, )),
+                                    ('velocity', '=f4', (3, )),
+                                    ('force', '=f4', (3, )),
+                                    ('vorticity', '=f4', (3, )),
+                                    ('normal', '=f4', (3, )),
+                                    ('neighbors', '=i4'),
+                                    ('texture', '=f4', (3, )),
+                                    ('infobits', '=i2'),
+                                    ('age', '=f4'),
+                                    ('isolation_time', '=f4'),
+                                    ('viscosity', '=f4'),
+                                    ('density', '=f4'),
+                                    ('pressure', '=f4'),
+                                    ('mass', '=f4'),
+                                    ('temperature', '=f4'),
+                                    ('id', '=i4'), ])
+# additional data per particle in appendix, only radius is written
+RFBIN_APPENDIX_DTYPE = numpy.dtype([('flag', '=?'),
+                                    ('radius', '=f4'), ])
+
+
 class RFBinWriter():
     """RealFlow particle .bin writer"""
     def __init__(self, directory, name, frame, particles, fps=24, size=0.001, log_indent=0, ):
@@ -41,7 +68,9 @@ class RFBinWriter():
         directory   string (path)
         name        string ascii
         frame       int >= 0
-        particles   list of (id int, x float, y float, z float, normal x float, normal y float, normal z float, velocity x float, velocity y float, velocity z float, radius float)
+        particles   list of (id int, x float, y float, z float, normal x float, normal y float, normal z float, velocity x float, velocity y float, velocity z float, radius float, u float, v float, w float)
+                    or dict of column arrays: {'ids': (n, ) int, 'positions': (n, 3) float, 'normals': (n, 3) float,
+                                               'velocities': (n, 3) float, 'radii': (n, ) float, 'uvs': (n, 3) float, }
         fps         int > 0
         size        float > 0
         """
@@ -72,10 +101,22 @@ class RFBinWriter():
         self.extension = ".bin"
         self.path = os.path.join(self.directory, "{0}-{1}{2}".format(self.name, str(self.frame).zfill(5), self.extension))
         
-        particle_length = 11 + 3
-        if(all(len(v) == particle_length for v in particles) is False):
-            raise ValueError("{}: bad particle data.".format(cn))
-        self.particles = particles
+        if(type(particles) is dict):
+            self.particles = self._columns(particles)
+            if(self.particles is None):
+                raise ValueError("{}: bad particle data.".format(cn))
+        else:
+            particle_length = 11 + 3
+            if(all(len(v) == particle_length for v in particles) is False):
+                raise ValueError("{}: bad particle data.".format(cn))
+            a = numpy.array(particles, dtype=numpy.float64, ).reshape(-1, particle_length)
+            self.particles = {'ids': a[:, 0],
+                              'positions': a[:, 1:4],
+                              'normals': a[:, 4:7],
+                              'velocities': a[:, 7:10],
+                              'radii': a[:, 10],
+                              'uvs': a[:, 11:14], }
+        self.count = len(self.particles['ids'])
         
         if(int(fps) < 0):
             raise ValueError("{}: fps is less than zero".format(cn))
@@ -89,6 +130,25 @@ class RFBinWriter():
         
         self._write()
     
+    def _columns(self, d):
+        keys = (('ids', 1), ('positions', 3), ('normals', 3), ('velocities', 3), ('radii', 1), ('uvs', 3), )
+        r = {}
+        n = None
+        for k, w in keys:
+            if(k not in d):
+                return None
+            a = numpy.asarray(d[k])
+            if(w == 1):
+                a = a.reshape(-1)
+            else:
+                a = a.reshape(-1, w)
+            if(n is None):
+                n = len(a)
+            if(len(a) != n):
+                return None
+            r[k] = a
+        return r
+    
     def _write(self):
         self._t = time.time()
         p = self.path
@@ -121,7 +181,7 @@ class RFBinWriter():
         # fps
         fw(p("=i", self.fps))
         # number of particles
-        fw(p("=i", len(self.particles)))
+        fw(p("=i", self.count))
         # particle size
         fw(p("=f", self.size))
         # pressure (max,min,average), speed (max,min,average), temperature (max,min,average)
@@ -130,25 +190,23 @@ class RFBinWriter():
         fw(p("=9f", 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0))
     
     def _particles(self, f, ):
-        p = struct.pack
-        fw = f.write
-        for v in self.particles:
-            # 3 position
-            fw(p("=3f", *v[1:4]))
-            # 3 velocity
-            fw(p("=3f", *v[7:10]))
-            # 3 force, 3 vorticity
-            fw(p("=ffffff", 0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
-            # 3 normal
-            fw(p("=3f", *v[4:7]))
-            # neighbors
-            fw(p("=i", 0, ))
-            # 3 texture
-            fw(p("=fff", *v[11:14]))
-            # infobits, age, isolationtime, viscosity, density, pressure, mass, temperature
-            fw(p("=hfffffff", 7, 0.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0))
-            # id
-            fw(p("=i", v[0]))
+        # whole particle block is filled column by column and written at once
+        d = self.particles
+        a = numpy.zeros(self.count, dtype=RFBIN_PARTICLE_DTYPE, )
+        a['position'] = d['positions']
+        a['velocity'] = d['velocities']
+        # force, vorticity, neighbors and age stay zero
+        a['normal'] = d['normals']
+        a['texture'] = d['uvs']
+        a['infobits'] = 7
+        a['isolation_time'] = 1.0
+        a['viscosity'] = 1.0
+        a['density'] = 1.0
+        a['pressure'] = 1.0
+        a['mass'] = 1.0
+        a['temperature'] = 1.0
+        a['id'] = d['ids']
+        a.tofile(f)
     
     def _appendix(self, f, ):
         p = struct.pack
@@ -164,11 +222,11 @@ class RFBinWriter():
         # owner of the particle id
         fw(p("=i", 0))
         
-        for v in self.particles:
-            # additional data?
-            fw(p("=?", True))
-            # additional data
-            fw(p("=f", v[10]))
+        # additional data? and additional data, for each particle
+        a = numpy.zeros(self.count, dtype=RFBIN_APPENDIX_DTYPE, )
+        a['flag'] = True
+        a['radius'] = self.particles['radii']
+        a.tofile(f)
         
         # RF4 internal data
         fw(p("=?", False))
@@ -176,6 +234,185 @@ class RFBinWriter():
         fw(p("=?", False))
 
 
+class RFBinReader():
+    """RealFlow particle .bin reader, particle records are memory mapped and read when accessed"""
+    def __init__(self, path, ):
+        """
+        path        string (path)
+        
+        header is read on init, particle data are numpy structured array views over mapped file. use as context manager,
+        or call close() when done and all array views are released. only version 11 files (as written by RFBinWriter) are supported.
+        """
+        cn = self.__class__.__name__
+        if(not os.path.exists(path)):
+            raise OSError("{}: did you point me to an imaginary file? ({})".format(cn, path))
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ, )
+        except ValueError:
+            # empty file cannot be mapped
+            self._file.close()
+            raise ValueError("{}: not a RealFlow particle file. ({})".format(cn, path))
+        
+        u = struct.unpack_from
+        b = self._map
+        o = 0
+        
+        def r(f):
+            nonlocal o
+            d = u(f, b, o)
+            o += struct.calcsize(f)
+            return d
+        
+        try:
+            if(len(b) < 356 or r("=i")[0] != 0xFABADA):
+                raise ValueError("{}: not a RealFlow particle file. ({})".format(cn, path))
+            self.name = r("=250s")[0].decode('utf-8').replace('\x00', '')
+            self.version, self.scale, self.fluid_type, self.simulation_time = r("=hfif")
+            if(self.version != 11):
+                raise ValueError("{}: unsupported version {}. ({})".format(cn, self.version, path))
+            self.frame = r("=i")[0]
+            self.fps = r("=i")[0]
+            self.count = r("=i")[0]
+            self.size = r("=f")[0]
+            self.pressure = r("=3f")
+            self.speed = r("=3f")
+            self.temperature = r("=3f")
+            self.emitter_position = r("=3f")
+            self.emitter_rotation = r("=3f")
+            self.emitter_scale = r("=3f")
+            
+            self._offset = o
+            o += self.count * RFBIN_PARTICLE_DTYPE.itemsize
+            if(len(b) < o):
+                raise ValueError("{}: file is truncated. ({})".format(cn, path))
+            
+            # appendix, mapped only if it is single radius per particle as written by RFBinWriter
+            self._appendix_offset = None
+            if(len(b) >= o + 4 * 5):
+                n, i, t, s, _ = r("=5i")
+                if(n == 1 and i == 2 and t == 4 and s == 4 and len(b) >= o + self.count * RFBIN_APPENDIX_DTYPE.itemsize):
+                    self._appendix_offset = o
+        except:
+            self.close()
+            raise
+    
+    @property
+    def particles(self):
+        """all particle records, numpy structured array view with RFBIN_PARTICLE_DTYPE"""
+        return numpy.frombuffer(self._map, dtype=RFBIN_PARTICLE_DTYPE, count=self.count, offset=self._offset, )
+    
+    @property
+    def positions(self):
+        return self.particles['position']
+    
+    @property
+    def velocities(self):
+        return self.particles['velocity']
+    
+    @property
+    def normals(self):
+        return self.particles['normal']
+    
+    @property
+    def uvs(self):
+        return self.particles['texture']
+    
+    @property
+    def ids(self):
+        return self.particles['id']
+    
+    @property
+    def radii(self):
+        """radius per particle from appendix, if file has none, particle size from header for all particles"""
+        if(self._appendix_offset is not None):
+            a = numpy.frombuffer(self._map, dtype=RFBIN_APPENDIX_DTYPE, count=self.count, offset=self._appendix_offset, )
+            if(numpy.all(a['flag'])):
+                return a['radius']
+        return numpy.full(self.count, self.size, dtype=numpy.float32, )
+    
+    def bounds(self, step=1, ):
+        """Return ((min x, min y, min z), (max x, max y, max z)) of particle positions or None if there are no particles.
+        step > 1 uses only each n-th particle, only pages with those records are read, result is approximate."""
+        if(self.count == 0):
+            return None
+        a = self.positions[::max(1, int(step))]
+        return tuple(a.min(axis=0).tolist()), tuple(a.max(axis=0).tolist())
+    
+    def close(self):
+        if(self._map is not None):
+            self._map.close()
+            self._map = None
+        if(self._file is not None):
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# directory: (modification time, {name: {frame: path}}), directory is scanned again only when it changes
+SEQUENCE_INDEX = {}
+
+
+def sequence_index(directory, ):
+    """Index of RealFlow .bin sequence files named 'name-00001.bin' in directory.
+    directory   string (path)
+    
+    returns {name: {frame: path}}, directory is scanned once and index is reused until directory modification time changes.
+    """
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return {}
+    c = SEQUENCE_INDEX.get(directory)
+    if(c is not None and c[0] == mtime):
+        return c[1]
+    r = {}
+    p = re.compile(r'^(.*)-(\d{5,})\.bin$')
+    for f in os.listdir(directory):
+        m = p.match(f)
+        if(m):
+            n, i = m.groups()
+            if(n not in r):
+                r[n] = {}
+            r[n][int(i)] = os.path.join(directory, f)
+    SEQUENCE_INDEX[directory] = (mtime, r, )
+    return r
+
+
+def write_sequence(directory, name, frames, sample, fps=24, size=0.001, workers=2, log_indent=0, ):
+    """Write RealFlow .bin file for each frame.
+    directory   string (path)
+    name        string ascii
+    frames      iterable of int >= 0
+    sample      function(frame) returning particles as accepted by RFBinWriter or None to skip frame
+    fps         int > 0
+    size        float > 0
+    workers     int > 0, number of writer threads
+    
+    sample is called on calling thread (bpy is not thread safe), encoding and writing of each frame runs in thread pool, so disk
+    writes overlap with sampling of next frames. at most workers + 1 frames are waiting in memory. returns written paths in frame order.
+    """
+    paths = []
+    pending = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for frame in frames:
+            particles = sample(frame)
+            if(particles is None):
+                continue
+            pending.append(executor.submit(RFBinWriter, directory, name, frame, particles, fps, size, log_indent, ))
+            while(len(pending) > workers):
+                paths.append(pending.popleft().result().path)
+        while(len(pending) > 0):
+            paths.append(pending.popleft().result().path)
+    return paths
+
+
 class ExportRFBin(Operator, ExportHelper):
     bl_idname = "maxwell_render.export_bin"
     bl_label = 'Realflow Particles (.bin)'
@@ -215,6 +452,9 @@ class ExportRFBin(Operator, ExportHelper):
     size = FloatProperty(name="Size", default=0.1, min=0.000001, max=1000000.0, step=3, precision=6, )
     use_uv = BoolProperty(name="Particle UV", default=False, )
     uv_layer = StringProperty(name="UV Layer", default="", )
+    use_frame_range = BoolProperty(name="Frame Range", default=False, description="Export .bin sequence, one file per frame", )
+    frame_start = IntProperty(name="Start", default=1, min=0, )
+    frame_end = IntProperty(name="End", default=250, min=0, )
     
     @classmethod
     def poll(cls, context):
@@ -232,6 +472,8 @@ class ExportRFBin(Operator, ExportHelper):
         p = context.blend_data.filepath
         d = os.path.split(p)[0]
         self.filepath = self._proper_bin_name_with_full_path(context, "", d)
+        self.frame_start = context.scene.frame_start
+        self.frame_end = context.scene.frame_end
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
     
@@ -252,29 +494,31 @@ class ExportRFBin(Operator, ExportHelper):
             c.enabled = False
         if(not self.use_uv):
             r.enabled = False
-    
-    def execute(self, context):
-        log('Export Realflow Particles (.bin)', 0, LogStyles.MESSAGE, )
-        log('use_velocity: {}, use_size: {}, size: {}, use_uv: {}, uv_layer: "{}"'.format(self.use_velocity, self.use_size, self.size, self.use_uv, self.uv_layer, ), 1, )
         
+        c = l.column()
+        c.prop(self, 'use_frame_range')
+        r = c.row(align=True)
+        r.prop(self, 'frame_start')
+        r.prop(self, 'frame_end')
+        if(not self.use_frame_range):
+            r.enabled = False
+    
+    def _sample(self, context):
+        """Particle data of active particle system at current frame, raise ValueError when there are no particles to export."""
         o = context.active_object
         ps = o.particle_systems.active
         pset = ps.settings
         
         # no particles (number of particles set to zero) and no alive particles > kill export
         if(len(ps.particles) == 0):
-            log("particle system {} has no particles".format(ps.name), 1, LogStyles.ERROR, )
-            self.report({'ERROR'}, "particle system {} has no particles".format(ps.name), )
-            return {'CANCELLED'}
+            raise ValueError("particle system {} has no particles".format(ps.name))
         ok = False
         for p in ps.particles:
             if(p.alive_state == "ALIVE"):
                 ok = True
                 break
         if(not ok):
-            log("particle system {} has no 'ALIVE' particles".format(ps.name), 1, LogStyles.ERROR, )
-            self.report({'ERROR'}, "particle system {} has no 'ALIVE' particles".format(ps.name), )
-            return {'CANCELLED'}
+            raise ValueError("particle system {} has no 'ALIVE' particles".format(ps.name))
         
         mat = o.matrix_world.copy()
         mat.invert()
@@ -373,12 +617,49 @@ class ExportRFBin(Operator, ExportHelper):
             uvt = (uvv.z, uvv.x, uvv.y, )
             particles.append((i, ) + tuple(ploc[:3]) + pnor.to_tuple() + tuple(vels[i][:3]) + (sizes[i], ) + uvt, )
         
-        # and now.. export!
+        return particles
+    
+    def execute(self, context):
+        log('Export Realflow Particles (.bin)', 0, LogStyles.MESSAGE, )
+        log('use_velocity: {}, use_size: {}, size: {}, use_uv: {}, uv_layer: "{}"'.format(self.use_velocity, self.use_size, self.size, self.use_uv, self.uv_layer, ), 1, )
+        
         h, t = os.path.split(self.filepath)
         n, e = os.path.splitext(t)
         # remove frame number automaticaly added in ui
         n = n[:-6]
         
+        if(self.use_frame_range):
+            if(self.frame_end < self.frame_start):
+                self.report({'ERROR'}, "end frame is before start frame", )
+                return {'CANCELLED'}
+            log('frame range: {} - {}'.format(self.frame_start, self.frame_end), 1, )
+            scene = context.scene
+            cf = scene.frame_current
+            
+            def sample(frame):
+                scene.frame_set(frame)
+                try:
+                    return self._sample(context)
+                except ValueError as e:
+                    log("frame {}: {}, skipped..".format(frame, e), 1, LogStyles.WARNING, )
+                    return None
+            
+            try:
+                paths = write_sequence(bpy.path.abspath(h), "{}".format(n), range(self.frame_start, self.frame_end + 1), sample,
+                                       bpy.context.scene.render.fps, 1.0 if self.use_size else self.size / 2, log_indent=1, )
+            finally:
+                scene.frame_set(cf)
+            log('{} files written.'.format(len(paths)), 1, )
+            return {'FINISHED'}
+        
+        try:
+            particles = self._sample(context)
+        except ValueError as err:
+            log("{}".format(err), 1, LogStyles.ERROR, )
+            self.report({'ERROR'}, "{}".format(err), )
+            return {'CANCELLED'}
+        
+        # and now.. export!
         cf = bpy.context.scene.frame_current
         prms = {'directory': bpy.path.abspath(h),
                 'name': "{}".format(n),
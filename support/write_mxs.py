@@ -33,6 +33,8 @@ import shutil
 import math
 import datetime
 import os
+import mmap
+import zlib
 
 
 quiet = False
@@ -49,110 +51,182 @@ def log(msg, indent=0):
             f.write("{}{}".format(m, "\n"))
 
 
-class MXSBinMeshReader():
-    def __init__(self, path):
-        def r(f, b, o):
-            d = struct.unpack_from(f, b, o)
-            o += struct.calcsize(f)
-            return d, o
-        
+class MXSBinMeshMappedReader():
+    def __init__(self, path, offset=0, length=None, ):
+        """Memory mapped BINMESH reader. Only header and section counts are read, section offsets are computed from them
+        and each section is returned as numpy array view over mapped file when accessed, so only pages actually used are loaded.
+        Use as context manager, or call close() when done and all array views are released.
+        BINMESH version 2 is supported as well, its compressed sections are decompressed when accessed.
+        path        string (path)
+        offset      int, start of BINMESH data in file, used when reading blob from MXSBinPack file
+        length      int or None, length of BINMESH data, None means until end of file
+        """
         def r0(f, b, o):
             d = struct.unpack_from(f, b, o)[0]
             o += struct.calcsize(f)
             return d, o
         
-        offset = 0
-        with open(path, "rb") as bf:
-            buff = bf.read()
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ, )
+        buff = self._map
+        if(length is None):
+            length = len(buff) - offset
+        end = offset + length
         # endianness?
         signature = 20357755437992258
-        l, _ = r0("<q", buff, 0)
-        b, _ = r0(">q", buff, 0)
-        if(l == signature):
+        signature_v2 = 164472943513848130
+        l, _ = r0("<q", buff, offset)
+        b, _ = r0(">q", buff, offset)
+        if(l == signature or l == signature_v2):
             if(sys.byteorder != "little"):
+                self.close()
                 raise RuntimeError()
             order = "<"
-        elif(b == signature):
+        elif(b == signature or b == signature_v2):
             if(sys.byteorder != "big"):
+                self.close()
                 raise RuntimeError()
             order = ">"
         else:
+            self.close()
             raise AssertionError("{}: not a MXSBinMesh file".format(self.__class__.__name__))
         o = order
+        f8 = numpy.dtype(o + 'f8')
+        i4 = numpy.dtype(o + 'i4')
+        
+        # section name: (offset, dtype, shape, compressed length or None)
+        self.index = {}
+        
+        def section(n, t, shape, o):
+            self.index[n] = (o, t, shape, None, )
+            c = 1
+            for i in shape:
+                c *= i
+            return o + c * t.itemsize
+        
+        def section2(n, shape, o):
+            # version 2 section: dtype, compression flag and length in bytes
+            t, o = r0(order + "2s", buff, o)
+            z, o = r0(order + "?", buff, o)
+            l, o = r0(order + "q", buff, o)
+            t = numpy.dtype(order + t.decode(encoding="utf-8"))
+            if(z):
+                self.index[n] = (o, t, shape, l, )
+            else:
+                self.index[n] = (o, t, shape, None, )
+            return o + l
+        
         # magic
         magic, offset = r0(o + "7s", buff, offset)
         magic = magic.decode(encoding="utf-8")
         if(magic != 'BINMESH'):
+            self.close()
             raise RuntimeError()
-        # throwaway
-        _, offset = r(o + "?", buff, offset)
+        # version, version 1 has False there
+        self.version, offset = r0(o + "B", buff, offset)
         # name
         name, offset = r0(o + "250s", buff, offset)
-        name = name.decode(encoding="utf-8").replace('\x00', '')
-        # number of steps
-        num_positions, offset = r0(o + "i", buff, offset)
-        # number of vertices
-        lv, offset = r0(o + "i", buff, offset)
-        # vertex positions
-        vertices = []
-        for i in range(num_positions):
-            vs, offset = r(o + "{}d".format(lv * 3), buff, offset)
-            vs3 = [vs[i:i + 3] for i in range(0, len(vs), 3)]
-            vertices.append(vs3)
-        # vertex normals
-        normals = []
-        for i in range(num_positions):
-            ns, offset = r(o + "{}d".format(lv * 3), buff, offset)
-            ns3 = [ns[i:i + 3] for i in range(0, len(ns), 3)]
-            normals.append(ns3)
-        # number of triangle normals
-        ltn, offset = r0(o + "i", buff, offset)
-        # triangle normals
-        triangle_normals = []
-        for i in range(num_positions):
-            tns, offset = r(o + "{}d".format(ltn * 3), buff, offset)
-            tns3 = [tns[i:i + 3] for i in range(0, len(tns), 3)]
-            triangle_normals.append(tns3)
-        # number of triangles
-        lt, offset = r0(o + "i", buff, offset)
-        # triangles
-        ts, offset = r(o + "{}i".format(lt * 6), buff, offset)
-        triangles = [ts[i:i + 6] for i in range(0, len(ts), 6)]
-        # number uv channels
-        num_channels, offset = r0(o + "i", buff, offset)
-        # uv channels
-        uv_channels = []
-        for i in range(num_channels):
-            uvc, offset = r(o + "{}d".format(lt * 9), buff, offset)
-            uv9 = [uvc[i:i + 9] for i in range(0, len(uvc), 9)]
-            uv_channels.append(uv9)
-        # number of materials
-        num_materials, offset = r0(o + "i", buff, offset)
-        # triangle materials
-        tms, offset = r(o + "{}i".format(2 * lt), buff, offset)
-        triangle_materials = [tms[i:i + 2] for i in range(0, len(tms), 2)]
+        self.name = name.decode(encoding="utf-8").replace('\x00', '')
+        if(self.version == 2):
+            # all counts first, then sections
+            self.num_positions, offset = r0(o + "i", buff, offset)
+            self.num_vertices, offset = r0(o + "i", buff, offset)
+            self.num_triangle_normals, offset = r0(o + "i", buff, offset)
+            self.num_triangles, offset = r0(o + "i", buff, offset)
+            self.num_channels, offset = r0(o + "i", buff, offset)
+            self.num_materials, offset = r0(o + "i", buff, offset)
+            offset = section2('vertices', (self.num_positions, self.num_vertices, 3), offset)
+            offset = section2('normals', (self.num_positions, self.num_vertices, 3), offset)
+            offset = section2('triangle_normals', (self.num_positions, self.num_triangle_normals, 3), offset)
+            offset = section2('triangles', (self.num_triangles, 6), offset)
+            offset = section2('uv_channels', (self.num_channels, self.num_triangles, 9), offset)
+            offset = section2('triangle_materials', (self.num_triangles, 2), offset)
+        else:
+            # number of steps
+            self.num_positions, offset = r0(o + "i", buff, offset)
+            # number of vertices
+            self.num_vertices, offset = r0(o + "i", buff, offset)
+            # vertex positions and vertex normals, all positions are stored one after another
+            offset = section('vertices', f8, (self.num_positions, self.num_vertices, 3), offset)
+            offset = section('normals', f8, (self.num_positions, self.num_vertices, 3), offset)
+            # triangle normals
+            self.num_triangle_normals, offset = r0(o + "i", buff, offset)
+            offset = section('triangle_normals', f8, (self.num_positions, self.num_triangle_normals, 3), offset)
+            # triangles
+            self.num_triangles, offset = r0(o + "i", buff, offset)
+            offset = section('triangles', i4, (self.num_triangles, 6), offset)
+            # uv channels
+            self.num_channels, offset = r0(o + "i", buff, offset)
+            offset = section('uv_channels', f8, (self.num_channels, self.num_triangles, 9), offset)
+            # triangle materials
+            self.num_materials, offset = r0(o + "i", buff, offset)
+            offset = section('triangle_materials', i4, (self.num_triangles, 2), offset)
         # throwaway
-        _, offset = r(o + "?", buff, offset)
+        _, offset = r0(o + "?", buff, offset)
         # and now.. eof
-        if(offset != len(buff)):
+        if(offset != end):
+            self.close()
             raise RuntimeError("expected EOF")
-        # collect data
-        self.data = {'name': name,
-                     'num_positions': num_positions,
-                     'vertices': vertices,
-                     'normals': normals,
-                     'triangles': triangles,
-                     'triangle_normals': triangle_normals,
-                     'uv_channels': uv_channels,
-                     'num_materials': num_materials,
-                     'triangle_materials': triangle_materials, }
+    
+    def _section(self, n):
+        o, t, shape, z = self.index[n]
+        c = 1
+        for i in shape:
+            c *= i
+        if(z is not None):
+            return numpy.frombuffer(zlib.decompress(self._map[o:o + z]), dtype=t, count=c, ).reshape(shape)
+        return numpy.frombuffer(self._map, dtype=t, count=c, offset=o, ).reshape(shape)
+    
+    @property
+    def vertices(self):
+        return self._section('vertices')
+    
+    @property
+    def normals(self):
+        return self._section('normals')
+    
+    @property
+    def triangle_normals(self):
+        return self._section('triangle_normals')
+    
+    @property
+    def triangles(self):
+        return self._section('triangles')
+    
+    @property
+    def uv_channels(self):
+        return self._section('uv_channels')
+    
+    @property
+    def triangle_materials(self):
+        return self._section('triangle_materials')
+    
+    def close(self):
+        if(self._map is not None):
+            self._map.close()
+            self._map = None
+        if(self._file is not None):
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class MXSBinHairReader():
-    def __init__(self, path):
+    def __init__(self, path, offset=0, length=None, ):
         self.offset = 0
         with open(path, "rb") as bf:
-            self.bindata = bf.read()
+            # whole file, or single blob from MXSBinPack file
+            bf.seek(offset)
+            if(length is None):
+                self.bindata = bf.read()
+            else:
+                self.bindata = bf.read(length)
         
         def r(f):
             d = struct.unpack_from(f, self.bindata, self.offset)
@@ -183,17 +257,24 @@ class MXSBinHairReader():
         _ = r(o + "?")
         # number floats
         self.num = r(o + "i")[0]
-        self.data = r(o + "{}d".format(self.num))
+        # numpy array view over file buffer (read only), converted to python floats just once when passed to pymaxwell
+        self.data = numpy.frombuffer(self.bindata, dtype=o + 'f8', count=self.num, offset=self.offset, )
+        self.offset += self.data.nbytes
         e = r(o + "?")
         if(self.offset != len(self.bindata)):
             raise RuntimeError("expected EOF")
 
 
 class MXSBinParticlesReader():
-    def __init__(self, path):
+    def __init__(self, path, offset=0, length=None, ):
         self.offset = 0
         with open(path, "rb") as bf:
-            self.bindata = bf.read()
+            # whole file, or single blob from MXSBinPack file
+            bf.seek(offset)
+            if(length is None):
+                self.bindata = bf.read()
+            else:
+                self.bindata = bf.read(length)
         
         def r(f):
             d = struct.unpack_from(f, self.bindata, self.offset)
@@ -248,10 +329,15 @@ class MXSBinParticlesReader():
 
 
 class MXSBinWireReader():
-    def __init__(self, path):
+    def __init__(self, path, offset=0, length=None, ):
         self.offset = 0
         with open(path, "rb") as bf:
-            self.bindata = bf.read()
+            # whole file, or single blob from MXSBinPack file
+            bf.seek(offset)
+            if(length is None):
+                self.bindata = bf.read()
+            else:
+                self.bindata = bf.read(length)
         
         def r(f):
             d = struct.unpack_from(f, self.bindata, self.offset)
@@ -299,6 +385,73 @@ class MXSBinWireReader():
             raise RuntimeError("expected EOF")
 
 
+class MXSBinPackReader():
+    def __init__(self, path):
+        """Read table of contents of MXSBinPack file, blobs are not read, use locate() to get their position in file."""
+        def r0(f, b, o):
+            d = struct.unpack_from(f, b, o)[0]
+            o += struct.calcsize(f)
+            return d, o
+        
+        self.path = path
+        with open(path, "rb") as bf:
+            head = bf.read(8)
+            # endianness?
+            signature = 21184571052542274
+            l, _ = r0("<q", head, 0)
+            b, _ = r0(">q", head, 0)
+            if(l == signature):
+                if(sys.byteorder != "little"):
+                    raise RuntimeError()
+                order = "<"
+            elif(b == signature):
+                if(sys.byteorder != "big"):
+                    raise RuntimeError()
+                order = ">"
+            else:
+                raise AssertionError("{}: not a MXSBinPack file".format(self.__class__.__name__))
+            o = order
+            # tail: number of blobs, toc offset and magic again
+            tail_size = struct.calcsize(o + "i") + struct.calcsize(o + "q") + 8
+            bf.seek(-tail_size, os.SEEK_END)
+            tail = bf.read(tail_size)
+            num, offset = r0(o + "i", tail, 0)
+            toc_offset, offset = r0(o + "q", tail, offset)
+            magic, offset = r0(o + "7s", tail, offset)
+            if(magic.decode(encoding="utf-8") != 'BINPACK'):
+                raise RuntimeError("expected BINPACK at the end of file")
+            # table of contents
+            entry = o + "250s7sqq"
+            bf.seek(toc_offset)
+            buff = bf.read(struct.calcsize(entry) * num)
+        
+        self.toc = {}
+        offset = 0
+        for i in range(num):
+            name, kind, a, l = struct.unpack_from(entry, buff, offset)
+            offset += struct.calcsize(entry)
+            name = name.decode(encoding="utf-8").replace('\x00', '')
+            self.toc[name] = (kind.decode(encoding="utf-8"), a, l, )
+    
+    def locate(self, name, kind=None, ):
+        """Return (offset, length) of named blob, optionally check its type."""
+        k, a, l = self.toc[name]
+        if(kind is not None and k != kind):
+            raise TypeError("{}: '{}' is {}, not {}".format(self.__class__.__name__, name, k, kind))
+        return a, l
+
+# path: MXSBinPackReader, table of contents of each pack is read just once
+PACKS = {}
+
+
+def blob(path, name, kind, ):
+    """Return (path, offset, length) of named blob in MXSBinPack file, suitable as reader arguments."""
+    if(path not in PACKS):
+        PACKS[path] = MXSBinPackReader(path)
+    offset, length = PACKS[path].locate(name, kind, )
+    return path, offset, length
+
+
 class PercentDone():
     def __init__(self, total, prefix="> ", indent=0):
         self.current = 0
@@ -328,6 +481,16 @@ class PercentDone():
                     f.write("{}".format("{0}{1}{2}%{3}".format(self.t * self.indent, self.prefix, 100, self.n)))
 
 
+# name: Cmaterial, None when it has to be read from scene first (appending to existing scene, erased materials)
+MATERIALS = {}
+
+
+def register_material(n, m, ):
+    """Remember created material by name."""
+    if(MATERIALS is not None):
+        MATERIALS[n] = m
+
+
 def material_placeholder(s, n=None, ):
     if(n is not None):
         pass
@@ -348,6 +511,7 @@ def material_placeholder(s, n=None, ):
     t.addProceduralTexture(ch)
     a.textureMap = t
     r.setAttribute('color', a)
+    register_material(n, m)
     return m
 
 
@@ -355,6 +519,7 @@ def material_default(d, s, ):
     m = s.createMaterial(d['name'])
     l = m.addLayer()
     b = l.addBSDF()
+    register_material(d['name'], m)
     return m
 
 
@@ -365,11 +530,13 @@ def material_external(d, s, ):
     m = s.addMaterial(t)
     if(not d['embed']):
         m.setReference(1, p)
+    register_material(d['name'], m)
     return m
 
 
 def material_custom(d, s, ):
     m = s.createMaterial(d['name'])
+    register_material(d['name'], m)
     d = d['data']
     
     def global_props(d, m):
@@ -1080,37 +1247,66 @@ def material(d, s, ):
                 pass
             
     elif(d['subtype'] == 'CUSTOM'):
-        material_custom(d, s, )
+        m = material_custom(d, s, )
     else:
         raise TypeError("Material '{}' {} is unknown type".format(d['name'], d['subtype']))
+    register_material(d['name'], m)
+    return m
+
+
+def scan_materials(s, ):
+    """Read material registry from scene if it is not valid."""
+    global MATERIALS
+    if(MATERIALS is not None):
+        return
+    r = {}
+    it = CmaxwellMaterialIterator()
+    o = it.first(s)
+    while not o.isNull():
+        name = o.getName()
+        r[name] = s.getMaterial(name)
+        o = it.next()
+    MATERIALS = r
 
 
 def get_material(n, s, ):
     """get material by name from scene, if material is missing, create and return placeholder"""
-    def get_material_names(s):
-        it = CmaxwellMaterialIterator()
-        o = it.first(s)
-        l = []
-        while not o.isNull():
-            name = o.getName()
-            l.append(name)
-            o = it.next()
-        return l
-    
-    names = get_material_names(s)
-    m = None
-    if(n in names):
-        m = s.getMaterial(n)
+    scan_materials(s)
+    m = MATERIALS.get(n)
     if(m is None):
         # should not happen because i stopped changing material names.. but i leave it here
         m = material_placeholder(s)
     return m
 
 
+# texture parameters key: CtextureMap, for texture() and texture_data_to_mxparams()
+TEXTURES = {}
+MXPARAMS_TEXTURES = {}
+
+
+def texture_key(d, ):
+    """Hashable key from texture parameters dict, nested dicts and lists are converted to tuples."""
+    if(type(d) is dict):
+        return tuple((k, texture_key(v)) for k, v in sorted(d.items()))
+    if(type(d) is list or type(d) is tuple):
+        return tuple(texture_key(v) for v in d)
+    return d
+
+
 def texture(d, s, ):
+    """get CtextureMap from parameters, textures with identical parameters are created just once"""
     if(d is None):
         return
     
+    k = texture_key(d)
+    t = TEXTURES.get(k)
+    if(t is None):
+        t = create_texture(d, s, )
+        TEXTURES[k] = t
+    return t
+
+
+def create_texture(d, s, ):
     t = CtextureMap()
     t.setPath(d['path'])
     
@@ -1567,41 +1763,120 @@ def camera(d, s, ):
     return c
 
 
+# name: CmaxwellObject, None when it has to be read from scene first (appending to existing scene)
+OBJECTS = {}
+
+
+def register_object(n, o, ):
+    """Remember created object by name."""
+    if(OBJECTS is not None):
+        OBJECTS[n] = o
+
+
+def scan_objects(s, ):
+    """Read object registry from scene if it is not valid."""
+    global OBJECTS
+    if(OBJECTS is not None):
+        return
+    r = {}
+    it = CmaxwellObjectIterator()
+    o = it.first(s)
+    while not o.isNull():
+        name, _ = o.getName()
+        r[name] = s.getObject(name)
+        o = it.next()
+    OBJECTS = r
+
+
+def get_object(n, s, ):
+    """get object by name, objects not created here are looked up in scene"""
+    scan_objects(s)
+    o = OBJECTS.get(n)
+    if(o is None):
+        o = s.getObject(n)
+    return o
+
+
 def empty(d, s, ):
     o = s.createMesh(d['name'], 0, 0, 0, 0,)
+    register_object(d['name'], o)
     base_and_pivot(o, d)
     object_props(o, d)
     return o
 
 
+def set_mesh_arrays(o, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, ):
+    """Fill mesh object made by createMesh() with geometry.
+    o                   CmaxwellObject
+    num_positions       int
+    vertices            (num_positions, n, 3) float array or list of (n, 3) float arrays, one per position
+    normals             the same as vertices
+    triangles           (n, 6) int array (3x vertex index, 3x normal index)
+    triangle_normals    the same as vertices
+    uv_channels         list of (n, 9) float arrays or None
+    
+    pymaxwell setters take one element at a time, so each array is converted to python values once, right before use,
+    bound methods are looked up once and single Cvector is reused for all vertices and normals.
+    """
+    def values(a):
+        if(type(a) is numpy.ndarray):
+            return a.tolist()
+        return a
+    
+    v = Cvector()
+    assign = v.assign
+    set_vertex = o.setVertex
+    set_normal = o.setNormal
+    # triangle normals are stored after vertex normals
+    an = len(normals[0])
+    for ip in range(num_positions):
+        vs = values(vertices[ip])
+        ns = values(normals[ip])
+        for i in range(len(vs)):
+            assign(*vs[i])
+            set_vertex(i, ip, v, )
+            assign(*ns[i])
+            set_normal(i, ip, v, )
+        del vs, ns
+        tns = values(triangle_normals[ip])
+        for i in range(len(tns)):
+            assign(*tns[i])
+            set_normal(an + i, ip, v, )
+        del tns
+    
+    set_triangle = o.setTriangle
+    ts = values(triangles)
+    for i in range(len(ts)):
+        set_triangle(i, *ts[i])
+    del ts
+    
+    if(uv_channels is not None):
+        set_uvw = o.setTriangleUVW
+        for iuv in range(len(uv_channels)):
+            uv = values(uv_channels[iuv])
+            for it in range(len(uv)):
+                set_uvw(it, iuv, *uv[it])
+            del uv
+
+
 def mesh(d, s, ):
-    r = MXSBinMeshReader(d['mesh_data_path'])
-    m = r.data
-    o = s.createMesh(d['name'], d['num_vertexes'], d['num_normals'], d['num_triangles'], d['num_positions_per_vertex'], )
-    
-    for i in range(len(m['uv_channels'])):
-        o.addChannelUVW(i)
-    
-    # an = 0
-    for ip in range(m['num_positions']):
-        # reset counter in each run, its value should be the same for each position anyway, it only used as offset for triangle normals
-        an = 0
-        verts = m['vertices'][ip]
-        norms = m['normals'][ip]
-        for i, loc in enumerate(verts):
-            o.setVertex(i, ip, Cvector(*loc), )
-            o.setNormal(i, ip, Cvector(*norms[i]), )
-            an += 1
-    
-    for ip in range(m['num_positions']):
-        trinorms = m['triangle_normals'][ip]
-        for i, nor in enumerate(trinorms):
-            o.setNormal(an + i, ip, Cvector(*nor), )
-    for i, tri in enumerate(m['triangles']):
-        o.setTriangle(i, *tri)
-    for iuv, uv in enumerate(m['uv_channels']):
-        for it, t in enumerate(uv):
-            o.setTriangleUVW(it, iuv, *t)
+    with MXSBinMeshMappedReader(*blob(d['mesh_data_path'], d['mesh_data'], 'BINMESH', )) as r:
+        o = s.createMesh(d['name'], d['num_vertexes'], d['num_normals'], d['num_triangles'], d['num_positions_per_vertex'], )
+        register_object(d['name'], o)
+        
+        for i in range(r.num_channels):
+            o.addChannelUVW(i)
+        
+        # pymaxwell does not like numpy arrays.. each section is mapped and converted to python values just once, right before use
+        # sections are passed directly, no view over mapped file can outlive reader, closing map would fail
+        if(r.num_channels > 0):
+            set_mesh_arrays(o, r.num_positions, r.vertices, r.normals, r.triangles, r.triangle_normals, r.uv_channels, )
+        else:
+            set_mesh_arrays(o, r.num_positions, r.vertices, r.normals, r.triangles, r.triangle_normals, None, )
+        
+        triangle_materials = None
+        if(d['num_materials'] > 1):
+            triangle_materials = r.triangle_materials.tolist()
     
     if(d['num_materials'] > 1):
         # multi material
@@ -1614,7 +1889,7 @@ def mesh(d, s, ):
                 mat = material_placeholder(s)
             mats.append(mat)
         
-        for tid, mid in m['triangle_materials']:
+        for tid, mid in triangle_materials:
             o.setTriangleMaterial(tid, mats[mid])
     else:
         # single material
@@ -1634,8 +1909,9 @@ def mesh(d, s, ):
 
 
 def instance(d, s, ):
-    bo = s.getObject(d['instanced'])
+    bo = get_object(d['instanced'], s, )
     o = s.createInstancement(d['name'], bo)
+    register_object(d['name'], o)
     
     if(d['num_materials'] > 1):
         # multi material instances inherits material from base object
@@ -1987,39 +2263,19 @@ def environment(d, s, ):
 
 
 def custom_alphas(d, s, ):
-    def get_material_names(s):
-        it = CmaxwellMaterialIterator()
-        o = it.first(s)
-        l = []
-        while not o.isNull():
-            name = o.getName()
-            l.append(name)
-            o = it.next()
-        return l
-    
-    def get_object_names(s):
-        it = CmaxwellObjectIterator()
-        o = it.first(s)
-        l = []
-        while not o.isNull():
-            name, _ = o.getName()
-            l.append(name)
-            o = it.next()
-        return l
-    
-    sobs = get_object_names(s)
-    smats = get_material_names(s)
+    scan_objects(s)
+    scan_materials(s)
     
     ags = d['channels_custom_alpha_groups']
     for a in ags:
         s.createCustomAlphaChannel(a['name'], a['opaque'])
         for n in a['objects']:
-            if(n in sobs):
-                o = s.getObject(n)
+            if(n in OBJECTS):
+                o = OBJECTS[n]
                 o.addToCustomAlpha(a['name'])
         for n in a['materials']:
-            if(n in smats):
-                m = s.getMaterial(n)
+            if(n in MATERIALS):
+                m = MATERIALS[n]
                 m.addToCustomAlpha(a['name'])
 
 
@@ -2029,8 +2285,7 @@ def particles(d, s, ):
     params = ext.getExtensionData()
     
     if(d['embed'] is True):
-        bpp = d['pdata']
-        r = MXSBinParticlesReader(bpp)
+        r = MXSBinParticlesReader(*blob(d['pdata'], d['pdata_name'], 'BINPART', ))
         
         c = Cbase()
         c.origin = Cvector(0.0, 0.0, 0.0)
@@ -2095,6 +2350,7 @@ def particles(d, s, ):
     params.setFloat('Max Velocity', d['bin_max_velocity'])
     
     o = s.createGeometryProceduralObject(d['name'], params)
+    register_object(d['name'], o)
     
     a, _ = o.addChannelUVW()
     o.generateCustomUVW(0, a)
@@ -2116,9 +2372,7 @@ def cloner(d, s, ):
     p = e.getExtensionData()
     
     if(d['embed'] is True):
-        bpp = d['pdata']
-        
-        r = MXSBinParticlesReader(bpp)
+        r = MXSBinParticlesReader(*blob(d['pdata'], d['pdata_name'], 'BINPART', ))
         
         c = Cbase()
         c.origin = Cvector(0.0, 0.0, 0.0)
@@ -2153,10 +2407,10 @@ def cloner(d, s, ):
     p.setUInt('Display Max. Particles', d['display_max'])
     
     if(not d['render_emitter']):
-        o = s.getObject(d['parent'])
+        o = get_object(d['parent'], s, )
         o.setHide(True)
     
-    o = s.getObject(d['cloned_object'])
+    o = get_object(d['cloned_object'], s, )
     o.applyGeometryModifierExtension(p)
 
 
@@ -2184,9 +2438,9 @@ def hair(d, s, ):
     c.yAxis = Cvector(0.0, 1.0, 0.0)
     c.zAxis = Cvector(0.0, 0.0, 1.0)
     
-    bhp = d['hair_data_path']
-    r = MXSBinHairReader(bhp)
-    p.setFloatArray('HAIR_POINTS', list(r.data), c)
+    r = MXSBinHairReader(*blob(d['hair_data_path'], d['hair_data'], 'BINHAIR', ))
+    p.setFloatArray('HAIR_POINTS', r.data.tolist(), c)
+    del r
     
     p.setFloatArray('HAIR_NORMALS', d['data']['HAIR_NORMALS'], c)
     
@@ -2204,6 +2458,7 @@ def hair(d, s, ):
         p.setDouble('Tip Radius', d['grass_tip_width'])
     
     o = s.createGeometryProceduralObject(d['name'], p)
+    register_object(d['name'], o)
     
     if(d['extension'] == 'MaxwellHair'):
         a, _ = o.addChannelUVW()
@@ -2231,6 +2486,7 @@ def hair(d, s, ):
 
 def reference(d, s, ):
     o = s.createMesh(d['name'], 0, 0, 0, 0,)
+    register_object(d['name'], o)
     base_and_pivot(o, d)
     object_props(o, d)
     o.setReferencedScenePath(d['path'])
@@ -2268,6 +2524,7 @@ def volumetrics(d, s, ):
     p.setFloat('Persistance', d['noise_persistence'])
     
     o = s.createGeometryProceduralObject(d['name'], p)
+    register_object(d['name'], o)
     
     if(d['material'] != ''):
         mat = get_material(d['material'], s, )
@@ -2286,7 +2543,7 @@ def subdivision(d, s, ):
     e = m.createDefaultGeometryModifierExtension('SubdivisionModifier')
     p = e.getExtensionData()
     
-    o = s.getObject(d['object'])
+    o = get_object(d['object'], s, )
     
     p.setUInt('Subdivision Level', d['level'])
     p.setUInt('Subdivision Scheme', d['scheme'])
@@ -2306,7 +2563,7 @@ def scatter(d, s, ):
     e = m.createDefaultGeometryModifierExtension('MaxwellScatter')
     p = e.getExtensionData()
     
-    o = s.getObject(d['object'])
+    o = get_object(d['object'], s, )
     e = d
     
     p.setString('Object', e['scatter_object'])
@@ -2403,7 +2660,7 @@ def grass(d, s, ):
     p.setUInt('Display Percent', d['display_percent'])
     p.setUInt('Display Max. Blades', d['display_max_blades'])
     
-    o = s.getObject(d['object'])
+    o = get_object(d['object'], s, )
     o.applyGeometryModifierExtension(p)
 
 
@@ -2428,6 +2685,7 @@ def sea(d, s, ):
     p.setByte('Enable White Caps', d['enable_white_caps'])
     
     o = s.createGeometryLoaderObject(d['name'], p)
+    register_object(d['name'], o)
     
     if(d['material'] != ''):
         mat = get_material(d['material'], s, )
@@ -2440,29 +2698,37 @@ def sea(d, s, ):
     object_props(o, d)
 
 
-def hierarchy(d, s, ):
+# types of records which are objects with parent
+HIERARCHY_TYPES = ['EMPTY', 'MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', 'WIREFRAME_CONTAINER', 'WIREFRAME_BASE', ]
+
+
+def hierarchy(tree, s, ):
+    """tree: [(obj_name, parent_name), ..., ] collected while objects were created"""
     log("setting object hierarchy..", 2)
-    a = ['CAMERA', 'EMPTY', 'MESH', 'MESH_INSTANCE', 'SCENE', 'ENVIRONMENT', 'PARTICLES', 'HAIR',
-         'REFERENCE', 'VOLUMETRICS', 'SUBDIVISION', 'SCATTER', 'GRASS', 'CLONER', 'SEA', ]
-    
-    object_types = ['EMPTY', 'MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', 'WIREFRAME_CONTAINER', 'WIREFRAME_BASE', ]
-    for i in range(len(d)):
-        if(d[i]['type'] in object_types):
-            if(d[i]['parent'] is not None):
-                ch = s.getObject(d[i]['name'])
-                p = s.getObject(d[i]['parent'])
-                ch.setParent(p)
+    for on, pn in tree:
+        ch = get_object(on, s, )
+        p = get_object(pn, s, )
+        ch.setParent(p)
+
+
+def scene_data(path, ):
+    """Read newline delimited json scene data record by record, yield (record, length of line in bytes)."""
+    with open(path, 'rb') as f:
+        for l in f:
+            yield json.loads(l.decode('utf-8')), len(l)
 
 
 def wireframe(d, s, ):
     r = []
-    bo = s.getObject(d['instanced'])
+    bo = get_object(d['instanced'], s, )
     
-    wr = MXSBinWireReader(d['wire_matrices'])
+    wr = MXSBinWireReader(*blob(d['wire_matrices'], d['wire_data'], 'BINWIRE', ))
     wire_matrices = wr.data
     
     for i, m in enumerate(wire_matrices):
-        o = s.createInstancement("{0}-{1}".format(d['name'], i), bo)
+        n = "{0}-{1}".format(d['name'], i)
+        o = s.createInstancement(n, bo)
+        register_object(n, o)
         bp = {'base': m[0],
               'pivot': m[1],
               'location': m[2],
@@ -2480,56 +2746,60 @@ def texture_data_to_mxparams(d, mp, name, ):
     if(d is None):
         return
     
-    t = CtextureMap()
-    t.setPath(d['path'])
-    v = Cvector2D()
-    v.assign(*d['repeat'])
-    t.scale = v
-    v = Cvector2D()
-    v.assign(*d['offset'])
-    t.offset = v
-    t.rotation = d['rotation']
-    t.uvwChannelID = d['channel']
-    t.uIsTiled = d['tile_method_type'][0]
-    t.vIsTiled = d['tile_method_type'][1]
-    t.uIsMirrored = d['mirror'][0]
-    t.vIsMirrored = d['mirror'][1]
-    t.invert = d['invert']
-    # t.doGammaCorrection = 0
-    t.useAbsoluteUnits = d['tile_method_units']
-    
-    t.normalMappingFlipRed = d['normal_mapping_flip_red']
-    t.normalMappingFlipGreen = d['normal_mapping_flip_green']
-    t.normalMappingFullRangeBlue = d['normal_mapping_full_range_blue']
-    
-    t.useAlpha = d['alpha_only']
-    t.typeInterpolation = d['interpolation']
-    
-    t.brightness = d['brightness'] / 100
-    t.contrast = d['contrast'] / 100
-    t.hue = d['hue'] / 180
-    t.saturation = d['saturation'] / 100
-    
-    t.clampMin = d['rgb_clamp'][0] / 255
-    t.clampMax = d['rgb_clamp'][1] / 255
-    
-    t.useGlobalMap = d['use_global_map']
-    # t.cosA = 1.000000
-    # t.sinA = 0.000000
+    k = texture_key(d)
+    t = MXPARAMS_TEXTURES.get(k)
+    if(t is None):
+        t = CtextureMap()
+        t.setPath(d['path'])
+        v = Cvector2D()
+        v.assign(*d['repeat'])
+        t.scale = v
+        v = Cvector2D()
+        v.assign(*d['offset'])
+        t.offset = v
+        t.rotation = d['rotation']
+        t.uvwChannelID = d['channel']
+        t.uIsTiled = d['tile_method_type'][0]
+        t.vIsTiled = d['tile_method_type'][1]
+        t.uIsMirrored = d['mirror'][0]
+        t.vIsMirrored = d['mirror'][1]
+        t.invert = d['invert']
+        # t.doGammaCorrection = 0
+        t.useAbsoluteUnits = d['tile_method_units']
+        
+        t.normalMappingFlipRed = d['normal_mapping_flip_red']
+        t.normalMappingFlipGreen = d['normal_mapping_flip_green']
+        t.normalMappingFullRangeBlue = d['normal_mapping_full_range_blue']
+        
+        t.useAlpha = d['alpha_only']
+        t.typeInterpolation = d['interpolation']
+        
+        t.brightness = d['brightness'] / 100
+        t.contrast = d['contrast'] / 100
+        t.hue = d['hue'] / 180
+        t.saturation = d['saturation'] / 100
+        
+        t.clampMin = d['rgb_clamp'][0] / 255
+        t.clampMax = d['rgb_clamp'][1] / 255
+        
+        t.useGlobalMap = d['use_global_map']
+        # t.cosA = 1.000000
+        # t.sinA = 0.000000
+        MXPARAMS_TEXTURES[k] = t
     ok = mp.setTextureMap(name, t)
     
     return mp
 
 
 def main(args):
-    log("loading data..", 2)
-    with open(args.scene_data_path, 'r') as f:
-        data = json.load(f)
+    global MATERIALS, OBJECTS
     # create scene
     mxs = Cmaxwell(mwcallback)
     if(args.append is True):
         log("appending to existing scene..", 2)
         mxs.readMXS(args.result_path)
+        MATERIALS = None
+        OBJECTS = None
     else:
         log("creating new scene..", 2)
     # instance manager
@@ -2542,11 +2812,27 @@ def main(args):
     wire_container = None
     wire_base = None
     
+    # scene data is streamed, only what is needed after all objects are created is kept
+    tree = []
+    clayable = ['MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', ]
+    clayable_names = []
+    active_cameras = []
+    scene_props = None
+    
     log("creating objects:", 2)
-    progress = PercentDone(len(data), indent=3, )
-    for d in data:
+    progress = PercentDone(os.path.getsize(args.scene_data_path), indent=3, )
+    for d, length in scene_data(args.scene_data_path):
+        if(d['type'] in HIERARCHY_TYPES):
+            if(d['parent'] is not None):
+                tree.append((d['name'], d['parent'], ))
+        if(d['type'] in clayable):
+            if(use_wireframe):
+                clayable_names.append(d['name'])
+        
         if(d['type'] == 'CAMERA'):
             camera(d, mxs)
+            if(d['active']):
+                active_cameras.append(d['name'])
         elif(d['type'] == 'EMPTY'):
             empty(d, mxs)
         elif(d['type'] == 'MESH'):
@@ -2560,6 +2846,7 @@ def main(args):
         elif(d['type'] == 'SCENE'):
             scene(d, mxs)
             custom_alphas(d, mxs)
+            scene_props = d
         elif(d['type'] == 'ENVIRONMENT'):
             environment(d, mxs)
         elif(d['type'] == 'PARTICLES'):
@@ -2592,9 +2879,9 @@ def main(args):
         
         else:
             raise TypeError("{0} is unknown type".format(d['type']))
-        progress.step()
+        progress.step(length)
     #
-    hierarchy(data, mxs)
+    hierarchy(tree, mxs)
     
     if(use_wireframe):
         for wi in all_wire_instances:
@@ -2620,46 +2907,36 @@ def main(args):
         export_wire_wire_material = None
         export_wire_clay_material = None
         
-        for d in data:
-            if(d['type'] == 'SCENE'):
-                export_clay_override_object_material = d['export_clay_override_object_material']
-                export_wire_wire_material = d['export_wire_wire_material']
-                export_wire_clay_material = d['export_wire_clay_material']
-                break
+        if(scene_props is not None):
+            export_clay_override_object_material = scene_props['export_clay_override_object_material']
+            export_wire_wire_material = scene_props['export_wire_wire_material']
+            export_wire_clay_material = scene_props['export_wire_clay_material']
         
         if(export_wire_clay_material is not None):
             wire = get_material(export_wire_wire_material, mxs, )
-            for d in data:
-                if(d['type'] == 'WIREFRAME_BASE'):
-                    o = mxs.getObject(d['name'])
-                    o.setMaterial(wire)
-                    break
+            wire_base.setMaterial(wire)
             for wi in all_wire_instances:
                 wi.setMaterial(wire)
         
         if(export_wire_clay_material is not None and export_clay_override_object_material):
             clay = get_material(export_wire_clay_material, mxs, )
-            clayable = ['MESH', 'MESH_INSTANCE', 'PARTICLES', 'HAIR', 'REFERENCE', 'VOLUMETRICS', 'SEA', ]
-            for d in data:
-                if(d['type'] in clayable):
-                    o = mxs.getObject(d['name'])
-                    o.setMaterial(clay)
+            for n in clayable_names:
+                o = get_object(n, mxs, )
+                o.setMaterial(clay)
     
     # set active camera, again.. for some reason it gets reset
-    for d in data:
-        if(d['type'] == 'CAMERA'):
-            if(d['active']):
-                c = mxs.getCamera(d['name'])
-                c.setActive()
+    for n in active_cameras:
+        c = mxs.getCamera(n)
+        c.setActive()
     # remove unused materials
     # FIXMENOT: disabled because it removes also backface materials if they are not used somewhere else as normal materials
     # mxs.eraseUnusedMaterials()
-    for d in data:
-        if(d['type'] == 'SCENE'):
-            if(d['export_remove_unused_materials']):
-                # optional, might also remove materials not supposed to be removed
-                log("removing unused materials..", 2)
-                mxs.eraseUnusedMaterials()
+    if(scene_props is not None):
+        if(scene_props['export_remove_unused_materials']):
+            # optional, might also remove materials not supposed to be removed
+            log("removing unused materials..", 2)
+            mxs.eraseUnusedMaterials()
+            MATERIALS = None
     # save mxs
     log("saving scene..", 2)
     ok = mxs.writeMXS(args.result_path)
@@ -2674,6 +2951,7 @@ if __name__ == "__main__":
     # parser.add_argument('-i', '--instancer', action='store_true', help='scene data contains instancer (python only)')
     parser.add_argument('-q', '--quiet', action='store_true', help='no logging except errors')
     parser.add_argument('pymaxwell_path', type=str, help='path to directory containing pymaxwell')
+    parser.add_argument('numpy_path', type=str, help='path to directory containing numpy')
     parser.add_argument('log_file', type=str, help='path to log file')
     parser.add_argument('scene_data_path', type=str, help='path to serialized scene data file')
     parser.add_argument('result_path', type=str, help='path to result .mxs')
@@ -2682,6 +2960,7 @@ if __name__ == "__main__":
     quiet = args.quiet
     
     PYMAXWELL_PATH = args.pymaxwell_path
+    NUMPY_PATH = args.numpy_path
     
     try:
         from pymaxwell import *
@@ -2691,6 +2970,12 @@ if __name__ == "__main__":
         sys.path.insert(0, PYMAXWELL_PATH)
         from pymaxwell import *
     
+    try:
+        import numpy
+    except ImportError:
+        sys.path.insert(0, NUMPY_PATH)
+        import numpy
+    
     LOG_FILE_PATH = args.log_file
     
     try:
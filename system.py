@@ -440,22 +440,26 @@ def python34_run_script_helper(script_path, scene_data_path, mxs_path, append, w
             raise Exception("huh?")
         
         PYMAXWELL_PATH = os.path.abspath(os.path.join(bpy.path.abspath(prefs().maxwell_path), 'Libs', 'pymaxwell', 'python3.5', ))
+        import numpy
+        NUMPY_PATH = os.path.split(os.path.split(numpy.__file__)[0])[0]
         
         if(switches != ''):
+            command_line = "{0} {1} {2} {3} {4} {5} {6} {7}".format(shlex.quote(PY),
+                                                                    shlex.quote(script_path),
+                                                                    switches,
+                                                                    shlex.quote(PYMAXWELL_PATH),
+                                                                    shlex.quote(NUMPY_PATH),
+                                                                    shlex.quote(LOG_FILE_PATH),
+                                                                    shlex.quote(scene_data_path),
+                                                                    shlex.quote(mxs_path), )
+        else:
             command_line = "{0} {1} {2} {3} {4} {5} {6}".format(shlex.quote(PY),
                                                                 shlex.quote(script_path),
-                                                                switches,
                                                                 shlex.quote(PYMAXWELL_PATH),
+                                                                shlex.quote(NUMPY_PATH),
                                                                 shlex.quote(LOG_FILE_PATH),
                                                                 shlex.quote(scene_data_path),
                                                                 shlex.quote(mxs_path), )
-        else:
-            command_line = "{0} {1} {2} {3} {4} {5}".format(shlex.quote(PY),
-                                                            shlex.quote(script_path),
-                                                            shlex.quote(PYMAXWELL_PATH),
-                                                            shlex.quote(LOG_FILE_PATH),
-                                                            shlex.quote(scene_data_path),
-                                                            shlex.quote(mxs_path), )
         
         log("command:", 2)
         log("{0}".format(command_line), 0, LogStyles.MESSAGE, prefix="")
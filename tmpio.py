@@ -18,8 +18,13 @@
 
 import os
 import shutil
+import json
 import struct
+import hashlib
 import sys
+import zlib
+
+import numpy
 
 
 class MXSBinMeshWriter():
@@ -184,27 +189,286 @@ class MXSBinMeshReader():
                      'triangle_materials': triangle_materials, }
 
 
+class MXSBinMeshArrayWriter():
+    def __init__(self, path, name, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, num_materials, triangle_materials,
+                 float_type='f8', compression=False, ):
+        """Write the same BINMESH format as MXSBinMeshWriter, but each section is dumped directly from numpy arrays.
+        With float_type 'f4' or compression, BINMESH version 2 is written instead.
+        name                sting
+        num_positions       int
+        vertices            [numpy.ndarray (n, 3) float, ...]       # one array per position
+        normals             [numpy.ndarray (n, 3) float, ...]       # one array per position
+        triangles           numpy.ndarray (n, 6) int                # (3x vertex index, 3x normal index)
+        triangle_normals    [numpy.ndarray (n, 3) float, ...]       # one array per position
+        uv_channels         [numpy.ndarray (n, 9) float, ...]       # ordered by uv index and ordered by triangle index
+        num_materials       int
+        triangle_materials  numpy.ndarray (n, 2) int                # (tri_id, mat_id)
+        float_type          string                                  # 'f8' or 'f4', type of stored floats
+        compression         bool                                    # zlib compress each section
+        """
+        with open("{0}.tmp".format(path), 'wb') as f:
+            self.write(f, name, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, num_materials, triangle_materials,
+                       float_type, compression, )
+        # swap files
+        if(os.path.exists(path)):
+            os.remove(path)
+        shutil.move("{0}.tmp".format(path), path)
+        self.path = path
+    
+    @staticmethod
+    def write(f, name, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, num_materials, triangle_materials,
+              float_type='f8', compression=False, ):
+        """Write data to already opened binary file object (at its current position)."""
+        if(float_type != 'f8' or compression):
+            MXSBinMeshArrayWriter._write_v2(f, name, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, num_materials,
+                                            triangle_materials, float_type, compression, )
+            return
+        o = "@"
+        f8 = numpy.dtype('=f8')
+        i4 = numpy.dtype('=i4')
+        
+        def w(f, a, t):
+            # native byte order, contiguous, converted only if needed
+            numpy.ascontiguousarray(a, dtype=t).tofile(f)
+        
+        p = struct.pack
+        fw = f.write
+        # header
+        fw(p(o + "7s", 'BINMESH'.encode('utf-8')))
+        fw(p(o + "?", False))
+        # name 250 max length
+        fw(p(o + "250s", name.encode('utf-8')))
+        # number of steps
+        fw(p(o + "i", num_positions))
+        # number of vertices
+        lv = len(vertices[0])
+        fw(p(o + "i", lv))
+        # vertex positions
+        for i in range(num_positions):
+            w(f, vertices[i], f8)
+        # vertex normals
+        for i in range(num_positions):
+            w(f, normals[i], f8)
+        # number triangle normals
+        ltn = len(triangle_normals[0])
+        fw(p(o + "i", ltn))
+        # triangle normals
+        for i in range(num_positions):
+            w(f, triangle_normals[i], f8)
+        # number of triangles
+        lt = len(triangles)
+        fw(p(o + "i", lt))
+        # triangles
+        w(f, triangles, i4)
+        # number of uv channels
+        luc = len(uv_channels)
+        fw(p(o + "i", luc))
+        # uv channels
+        for i in range(luc):
+            w(f, uv_channels[i], f8)
+        # number of materials
+        fw(p(o + "i", num_materials))
+        # triangle materials
+        w(f, triangle_materials, i4)
+        # end
+        fw(p(o + "?", False))
+    
+    @staticmethod
+    def _write_v2(f, name, num_positions, vertices, normals, triangles, triangle_normals, uv_channels, num_materials, triangle_materials,
+                  float_type, compression, ):
+        """BINMESH version 2, all counts are in header, each section starts with its dtype, compression flag and length in bytes.
+        
+        7s 'BINMESH', B 2
+        250s name
+        i num_positions, i num_vertices, i num_triangle_normals, i num_triangles, i num_channels, i num_materials
+        section: vertices, normals, triangle_normals, triangles, uv_channels, triangle_materials
+            2s dtype ('f4', 'f8', 'i4'), ? compressed, q length, data (all positions / channels one after another)
+        ? False
+        """
+        o = "@"
+        ft = numpy.dtype('=' + float_type)
+        i4 = numpy.dtype('=i4')
+        p = struct.pack
+        fw = f.write
+        
+        def section(arrays, t):
+            # native byte order, contiguous, converted only if needed
+            arrays = [numpy.ascontiguousarray(a, dtype=t) for a in arrays]
+            fw(p(o + "2s", t.str[1:].encode('utf-8')))
+            fw(p(o + "?", compression))
+            if(compression):
+                c = zlib.compressobj(1)
+                b = b''.join([c.compress(a) for a in arrays] + [c.flush()])
+                fw(p(o + "q", len(b)))
+                fw(b)
+            else:
+                fw(p(o + "q", sum([a.nbytes for a in arrays])))
+                for a in arrays:
+                    a.tofile(f)
+        
+        # header
+        fw(p(o + "7s", 'BINMESH'.encode('utf-8')))
+        fw(p(o + "B", 2))
+        fw(p(o + "250s", name.encode('utf-8')))
+        # counts
+        fw(p(o + "i", num_positions))
+        fw(p(o + "i", len(vertices[0])))
+        fw(p(o + "i", len(triangle_normals[0])))
+        fw(p(o + "i", len(triangles)))
+        fw(p(o + "i", len(uv_channels)))
+        fw(p(o + "i", num_materials))
+        # sections
+        section(vertices[:num_positions], ft)
+        section(normals[:num_positions], ft)
+        section(triangle_normals[:num_positions], ft)
+        section([triangles], i4)
+        section(uv_channels, ft)
+        section([triangle_materials], i4)
+        # end
+        fw(p(o + "?", False))
+
+
+class MXSBinMeshArrayReader():
+    def __init__(self, path):
+        """Read BINMESH file (version 1 or 2), sections are returned as numpy array views over file buffer (read only),
+        compressed sections are decompressed to new arrays."""
+        def r0(f, b, o):
+            d = struct.unpack_from(f, b, o)[0]
+            o += struct.calcsize(f)
+            return d, o
+        
+        def a(t, shape, b, o):
+            n = 1
+            for s in shape:
+                n *= s
+            d = numpy.frombuffer(b, dtype=t, count=n, offset=o, ).reshape(shape)
+            o += d.nbytes
+            return d, o
+        
+        def s(shape, b, o):
+            # version 2 section: dtype, compression flag and length in bytes
+            t, o = r0(order + "2s", b, o)
+            z, o = r0(order + "?", b, o)
+            l, o = r0(order + "q", b, o)
+            t = numpy.dtype(order + t.decode(encoding="utf-8"))
+            if(z):
+                d, _ = a(t, shape, zlib.decompress(b[o:o + l]), 0)
+            else:
+                d, _ = a(t, shape, b, o)
+            return d, o + l
+        
+        offset = 0
+        with open(path, "rb") as bf:
+            buff = bf.read()
+        # endianness?
+        signature = 20357755437992258
+        signature_v2 = 164472943513848130
+        l, _ = r0("<q", buff, 0)
+        b, _ = r0(">q", buff, 0)
+        if(l == signature or l == signature_v2):
+            if(sys.byteorder != "little"):
+                raise RuntimeError()
+            order = "<"
+        elif(b == signature or b == signature_v2):
+            if(sys.byteorder != "big"):
+                raise RuntimeError()
+            order = ">"
+        else:
+            raise AssertionError("{}: not a MXSBinMesh file".format(self.__class__.__name__))
+        o = order
+        f8 = numpy.dtype(o + 'f8')
+        i4 = numpy.dtype(o + 'i4')
+        # magic
+        magic, offset = r0(o + "7s", buff, offset)
+        magic = magic.decode(encoding="utf-8")
+        if(magic != 'BINMESH'):
+            raise RuntimeError()
+        # version, version 1 has False there
+        version, offset = r0(o + "B", buff, offset)
+        # name
+        name, offset = r0(o + "250s", buff, offset)
+        name = name.decode(encoding="utf-8").replace('\x00', '')
+        if(version == 2):
+            num_positions, offset = r0(o + "i", buff, offset)
+            lv, offset = r0(o + "i", buff, offset)
+            ltn, offset = r0(o + "i", buff, offset)
+            lt, offset = r0(o + "i", buff, offset)
+            num_channels, offset = r0(o + "i", buff, offset)
+            num_materials, offset = r0(o + "i", buff, offset)
+            vertices, offset = s((num_positions, lv, 3), buff, offset)
+            normals, offset = s((num_positions, lv, 3), buff, offset)
+            triangle_normals, offset = s((num_positions, ltn, 3), buff, offset)
+            triangles, offset = s((lt, 6), buff, offset)
+            uv_channels, offset = s((num_channels, lt, 9), buff, offset)
+            triangle_materials, offset = s((lt, 2), buff, offset)
+        else:
+            # number of steps
+            num_positions, offset = r0(o + "i", buff, offset)
+            # number of vertices
+            lv, offset = r0(o + "i", buff, offset)
+            # vertex positions, all positions are stored one after another
+            vertices, offset = a(f8, (num_positions, lv, 3), buff, offset)
+            # vertex normals
+            normals, offset = a(f8, (num_positions, lv, 3), buff, offset)
+            # number of triangle normals
+            ltn, offset = r0(o + "i", buff, offset)
+            # triangle normals
+            triangle_normals, offset = a(f8, (num_positions, ltn, 3), buff, offset)
+            # number of triangles
+            lt, offset = r0(o + "i", buff, offset)
+            # triangles
+            triangles, offset = a(i4, (lt, 6), buff, offset)
+            # number uv channels
+            num_channels, offset = r0(o + "i", buff, offset)
+            # uv channels
+            uv_channels, offset = a(f8, (num_channels, lt, 9), buff, offset)
+            # number of materials
+            num_materials, offset = r0(o + "i", buff, offset)
+            # triangle materials
+            triangle_materials, offset = a(i4, (lt, 2), buff, offset)
+        # throwaway
+        _, offset = r0(o + "?", buff, offset)
+        # and now.. eof
+        if(offset != len(buff)):
+            raise RuntimeError("expected EOF")
+        # collect data
+        self.data = {'name': name,
+                     'num_positions': num_positions,
+                     'vertices': vertices,
+                     'normals': normals,
+                     'triangles': triangles,
+                     'triangle_normals': triangle_normals,
+                     'uv_channels': uv_channels,
+                     'num_materials': num_materials,
+                     'triangle_materials': triangle_materials, }
+
+
 class MXSBinHairWriter():
     def __init__(self, path, data):
-        d = data
-        o = "@"
         with open("{0}.tmp".format(path), 'wb') as f:
-            p = struct.pack
-            fw = f.write
-            # header
-            fw(p(o + "7s", 'BINHAIR'.encode('utf-8')))
-            fw(p(o + "?", False))
-            # number of floats
-            n = len(d)
-            fw(p(o + "i", n))
-            # floats
-            fw(p(o + "{}d".format(n), *d))
-            # end
-            fw(p(o + "?", False))
+            self.write(f, data)
         if(os.path.exists(path)):
             os.remove(path)
         shutil.move("{0}.tmp".format(path), path)
         self.path = path
+    
+    @staticmethod
+    def write(f, data):
+        # data is flat numpy array (or sequence) of floats, written as native doubles at once
+        d = numpy.ascontiguousarray(data, dtype='=f8').reshape(-1)
+        o = "@"
+        p = struct.pack
+        fw = f.write
+        # header
+        fw(p(o + "7s", 'BINHAIR'.encode('utf-8')))
+        fw(p(o + "?", False))
+        # number of floats
+        n = len(d)
+        fw(p(o + "i", n))
+        # floats
+        d.tofile(f)
+        # end
+        fw(p(o + "?", False))
 
 
 class MXSBinHairReader():
@@ -242,7 +506,9 @@ class MXSBinHairReader():
         _ = r(o + "?")
         # number floats
         self.num = r(o + "i")[0]
-        self.data = r(o + "{}d".format(self.num))
+        # numpy array view over file buffer (read only)
+        self.data = numpy.frombuffer(self.bindata, dtype=o + 'f8', count=self.num, offset=self.offset, )
+        self.offset += self.data.nbytes
         e = r(o + "?")
         if(self.offset != len(self.bindata)):
             raise RuntimeError("expected EOF")
@@ -250,44 +516,48 @@ class MXSBinHairReader():
 
 class MXSBinParticlesWriter():
     def __init__(self, path, data):
-        d = data
-        o = "@"
         with open("{0}.tmp".format(path), 'wb') as f:
-            p = struct.pack
-            fw = f.write
-            # header
-            fw(p(o + "7s", 'BINPART'.encode('utf-8')))
-            fw(p(o + "?", False))
-            # 'PARTICLE_POSITIONS'
-            n = len(d['PARTICLE_POSITIONS'])
-            fw(p(o + "i", n))
-            fw(p(o + "{}d".format(n), *d['PARTICLE_POSITIONS']))
-            # 'PARTICLE_SPEEDS'
-            n = len(d['PARTICLE_SPEEDS'])
-            fw(p(o + "i", n))
-            fw(p(o + "{}d".format(n), *d['PARTICLE_SPEEDS']))
-            # 'PARTICLE_RADII'
-            n = len(d['PARTICLE_RADII'])
-            fw(p(o + "i", n))
-            fw(p(o + "{}d".format(n), *d['PARTICLE_RADII']))
-            # 'PARTICLE_NORMALS'
-            n = len(d['PARTICLE_NORMALS'])
-            fw(p(o + "i", n))
-            fw(p(o + "{}d".format(n), *d['PARTICLE_NORMALS']))
-            # 'PARTICLE_IDS'
-            n = len(d['PARTICLE_IDS'])
-            fw(p(o + "i", n))
-            fw(p(o + "{}i".format(n), *d['PARTICLE_IDS']))
-            # 'PARTICLE_UVW'
-            n = len(d['PARTICLE_UVW'])
-            fw(p(o + "i", n))
-            fw(p(o + "{}d".format(n), *d['PARTICLE_UVW']))
-            # end
-            fw(p(o + "?", False))
+            self.write(f, data)
         if(os.path.exists(path)):
             os.remove(path)
         shutil.move("{0}.tmp".format(path), path)
         self.path = path
+    
+    @staticmethod
+    def write(f, data):
+        d = data
+        o = "@"
+        p = struct.pack
+        fw = f.write
+        # header
+        fw(p(o + "7s", 'BINPART'.encode('utf-8')))
+        fw(p(o + "?", False))
+        # 'PARTICLE_POSITIONS'
+        n = len(d['PARTICLE_POSITIONS'])
+        fw(p(o + "i", n))
+        fw(p(o + "{}d".format(n), *d['PARTICLE_POSITIONS']))
+        # 'PARTICLE_SPEEDS'
+        n = len(d['PARTICLE_SPEEDS'])
+        fw(p(o + "i", n))
+        fw(p(o + "{}d".format(n), *d['PARTICLE_SPEEDS']))
+        # 'PARTICLE_RADII'
+        n = len(d['PARTICLE_RADII'])
+        fw(p(o + "i", n))
+        fw(p(o + "{}d".format(n), *d['PARTICLE_RADII']))
+        # 'PARTICLE_NORMALS'
+        n = len(d['PARTICLE_NORMALS'])
+        fw(p(o + "i", n))
+        fw(p(o + "{}d".format(n), *d['PARTICLE_NORMALS']))
+        # 'PARTICLE_IDS'
+        n = len(d['PARTICLE_IDS'])
+        fw(p(o + "i", n))
+        fw(p(o + "{}i".format(n), *d['PARTICLE_IDS']))
+        # 'PARTICLE_UVW'
+        n = len(d['PARTICLE_UVW'])
+        fw(p(o + "i", n))
+        fw(p(o + "{}d".format(n), *d['PARTICLE_UVW']))
+        # end
+        fw(p(o + "?", False))
 
 
 class MXSBinParticlesReader():
@@ -350,30 +620,34 @@ class MXSBinParticlesReader():
 
 class MXSBinWireWriter():
     def __init__(self, path, data):
-        d = data
-        o = "@"
         with open("{0}.tmp".format(path), 'wb') as f:
-            p = struct.pack
-            fw = f.write
-            # header
-            fw(p(o + "7s", 'BINWIRE'.encode('utf-8')))
-            fw(p(o + "?", False))
-            # number of wires
-            n = len(d)
-            fw(p(o + "i", n))
-            fw(p(o + "?", False))
-            # data
-            for base, pivot, loc, rot, sca in data:
-                base = tuple(sum(base, ()))
-                pivot = tuple(sum(pivot, ()))
-                w = base + pivot + loc + rot + sca
-                fw(p(o + "33d", *w))
-            # end
-            fw(p(o + "?", False))
+            self.write(f, data)
         if(os.path.exists(path)):
             os.remove(path)
         shutil.move("{0}.tmp".format(path), path)
         self.path = path
+    
+    @staticmethod
+    def write(f, data):
+        d = data
+        o = "@"
+        p = struct.pack
+        fw = f.write
+        # header
+        fw(p(o + "7s", 'BINWIRE'.encode('utf-8')))
+        fw(p(o + "?", False))
+        # number of wires
+        n = len(d)
+        fw(p(o + "i", n))
+        fw(p(o + "?", False))
+        # data
+        for base, pivot, loc, rot, sca in data:
+            base = tuple(sum(base, ()))
+            pivot = tuple(sum(pivot, ()))
+            w = base + pivot + loc + rot + sca
+            fw(p(o + "33d", *w))
+        # end
+        fw(p(o + "?", False))
 
 
 class MXSBinWireReader():
@@ -428,6 +702,213 @@ class MXSBinWireReader():
             raise RuntimeError("expected EOF")
 
 
+class MXSBinPackWriter():
+    def __init__(self, path, ):
+        """Single file container for all intermediate data of one export. Blobs are appended one after another in the same
+        formats as separate .binmesh, .binhair, .binpart and .binwire files, table of contents is written at the end on close().
+        path        string (path)
+        
+        layout:
+        7s 'BINPACK', ? False
+        blobs..
+        table of contents, for each blob: 250s name, 7s type, q offset, q length
+        i number of blobs, q table of contents offset
+        7s 'BINPACK', ? False
+        """
+        self.path = path
+        self.toc = []
+        self.names = set()
+        # mesh data digest: blob name
+        self.digests = {}
+        self.f = open("{0}.tmp".format(path), 'wb')
+        o = "@"
+        p = struct.pack
+        fw = self.f.write
+        fw(p(o + "7s", 'BINPACK'.encode('utf-8')))
+        fw(p(o + "?", False))
+    
+    def _append(self, name, kind, writer, *args):
+        if(name in self.names):
+            raise KeyError("{}: '{}' already exists".format(self.__class__.__name__, name))
+        if(len(name.encode('utf-8')) > 250):
+            raise ValueError("{}: '{}' name is too long".format(self.__class__.__name__, name))
+        f = self.f
+        offset = f.tell()
+        writer(f, *args)
+        length = f.tell() - offset
+        self.toc.append((name, kind, offset, length, ))
+        self.names.add(name)
+        return name
+    
+    def mesh(self, name, md, float_type='f8', compression=False, ):
+        """Append mesh data, identical data is stored only once. Returns name of blob with data, that is name of blob
+        already in pack when data has been written before, otherwise given name. Mesh name stored in BINMESH header is not
+        compared, it is not used when data is read. float_type and compression are passed to MXSBinMeshArrayWriter."""
+        f8 = numpy.dtype('=f8')
+        i4 = numpy.dtype('=i4')
+        
+        def a(v, t):
+            return numpy.ascontiguousarray(v, dtype=t)
+        
+        # convert once, arrays are written as they are
+        vertices = [a(v, f8) for v in md['vertices']]
+        normals = [a(v, f8) for v in md['normals']]
+        triangles = a(md['triangles'], i4)
+        triangle_normals = [a(v, f8) for v in md['triangle_normals']]
+        uv_channels = [a(v, f8) for v in md['uv_channels']]
+        triangle_materials = a(md['triangle_materials'], i4)
+        
+        h = hashlib.sha1()
+        h.update(struct.pack("@ii", md['num_positions'], md['num_materials']))
+        for l in (vertices, normals, [triangles], triangle_normals, uv_channels, [triangle_materials], ):
+            h.update(struct.pack("@i", len(l)))
+            for v in l:
+                h.update(str(v.shape).encode('utf-8'))
+                h.update(v)
+        digest = h.hexdigest()
+        if(digest in self.digests):
+            return self.digests[digest]
+        
+        self._append(name, 'BINMESH', MXSBinMeshArrayWriter.write, md['name'], md['num_positions'], vertices, normals, triangles,
+                     triangle_normals, uv_channels, md['num_materials'], triangle_materials, float_type, compression, )
+        self.digests[digest] = name
+        return name
+    
+    def hair(self, name, data, ):
+        return self._append(name, 'BINHAIR', MXSBinHairWriter.write, data, )
+    
+    def particles(self, name, data, ):
+        return self._append(name, 'BINPART', MXSBinParticlesWriter.write, data, )
+    
+    def wire(self, name, data, ):
+        return self._append(name, 'BINWIRE', MXSBinWireWriter.write, data, )
+    
+    def close(self):
+        if(self.f is None):
+            return
+        o = "@"
+        p = struct.pack
+        fw = self.f.write
+        offset = self.f.tell()
+        for name, kind, a, l in self.toc:
+            fw(p(o + "250s", name.encode('utf-8')))
+            fw(p(o + "7s", kind.encode('utf-8')))
+            fw(p(o + "q", a))
+            fw(p(o + "q", l))
+        fw(p(o + "i", len(self.toc)))
+        fw(p(o + "q", offset))
+        fw(p(o + "7s", 'BINPACK'.encode('utf-8')))
+        fw(p(o + "?", False))
+        self.f.close()
+        self.f = None
+        # swap files
+        if(os.path.exists(self.path)):
+            os.remove(self.path)
+        shutil.move("{0}.tmp".format(self.path), self.path)
+    
+    def abort(self):
+        """Close and remove unfinished file, used when export fails."""
+        if(self.f is None):
+            return
+        self.f.close()
+        self.f = None
+        p = "{0}.tmp".format(self.path)
+        if(os.path.exists(p)):
+            os.remove(p)
+
+
+class MXSBinPackReader():
+    def __init__(self, path):
+        """Read table of contents of MXSBinPack file, blobs are not read, use locate() to get their position in file."""
+        def r0(f, b, o):
+            d = struct.unpack_from(f, b, o)[0]
+            o += struct.calcsize(f)
+            return d, o
+        
+        self.path = path
+        with open(path, "rb") as bf:
+            head = bf.read(8)
+            # endianness?
+            signature = 21184571052542274
+            l, _ = r0("<q", head, 0)
+            b, _ = r0(">q", head, 0)
+            if(l == signature):
+                if(sys.byteorder != "little"):
+                    raise RuntimeError()
+                order = "<"
+            elif(b == signature):
+                if(sys.byteorder != "big"):
+                    raise RuntimeError()
+                order = ">"
+            else:
+                raise AssertionError("{}: not a MXSBinPack file".format(self.__class__.__name__))
+            o = order
+            # tail: number of blobs, toc offset and magic again
+            tail_size = struct.calcsize(o + "i") + struct.calcsize(o + "q") + 8
+            bf.seek(-tail_size, os.SEEK_END)
+            tail = bf.read(tail_size)
+            num, offset = r0(o + "i", tail, 0)
+            toc_offset, offset = r0(o + "q", tail, offset)
+            magic, offset = r0(o + "7s", tail, offset)
+            if(magic.decode(encoding="utf-8") != 'BINPACK'):
+                raise RuntimeError("expected BINPACK at the end of file")
+            # table of contents
+            entry = o + "250s7sqq"
+            bf.seek(toc_offset)
+            buff = bf.read(struct.calcsize(entry) * num)
+        
+        self.toc = {}
+        offset = 0
+        for i in range(num):
+            name, kind, a, l = struct.unpack_from(entry, buff, offset)
+            offset += struct.calcsize(entry)
+            name = name.decode(encoding="utf-8").replace('\x00', '')
+            self.toc[name] = (kind.decode(encoding="utf-8"), a, l, )
+    
+    def locate(self, name, kind=None, ):
+        """Return (offset, length) of named blob, optionally check its type."""
+        k, a, l = self.toc[name]
+        if(kind is not None and k != kind):
+            raise TypeError("{}: '{}' is {}, not {}".format(self.__class__.__name__, name, k, kind))
+        return a, l
+
+
+class MXSSceneDataWriter():
+    def __init__(self, path, ):
+        """Scene data as newline delimited json, one compact record per line, records are written as they come.
+        path        string (path)
+        """
+        self.path = path
+        self.f = open("{0}.tmp".format(path), 'w', encoding='utf-8', )
+    
+    def write(self, d, ):
+        """Append one record.
+        d           dict, json serializable
+        """
+        self.f.write(json.dumps(d, skipkeys=False, ensure_ascii=False, separators=(',', ':'), ))
+        self.f.write("\n")
+    
+    def close(self):
+        if(self.f is None):
+            return
+        self.f.close()
+        self.f = None
+        # swap files
+        if(os.path.exists(self.path)):
+            os.remove(self.path)
+        shutil.move("{0}.tmp".format(self.path), self.path)
+    
+    def abort(self):
+        """Close and remove unfinished file, used when export fails."""
+        if(self.f is None):
+            return
+        self.f.close()
+        self.f = None
+        p = "{0}.tmp".format(self.path)
+        if(os.path.exists(p)):
+            os.remove(p)
+
+
 class MXSBinRefVertsWriter():
     def __init__(self, path, data, ):
         o = "@"
@@ -522,3 +1003,80 @@ class MXSBinRefVertsReader():
         # and now.. eof
         if(offset != len(buff)):
             raise RuntimeError("expected EOF")
+
+
+class MXSMeshCache():
+    def __init__(self, directory, max_size, ):
+        """Persistent cache of converted mesh arrays, one .npz file per key, least recently used files are removed when
+        total size exceeds max_size. Directory is scanned once, then file times and sizes are tracked in memory.
+        directory   string (path), created if does not exist
+        max_size    int, bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        if(not os.path.exists(directory)):
+            os.makedirs(directory)
+        # file name: (mtime, size)
+        self.entries = {}
+        self.total = 0
+        for n in os.listdir(self.directory):
+            if(not n.endswith(".npz")):
+                continue
+            st = os.stat(os.path.join(self.directory, n))
+            self.entries[n] = (st.st_mtime, st.st_size, )
+            self.total += st.st_size
+    
+    def _name(self, key, ):
+        return "{0}.npz".format(key)
+    
+    def _path(self, key, ):
+        return os.path.join(self.directory, self._name(key))
+    
+    def _remove(self, n, ):
+        p = os.path.join(self.directory, n)
+        if(os.path.exists(p)):
+            os.remove(p)
+        if(n in self.entries):
+            self.total -= self.entries[n][1]
+            del self.entries[n]
+    
+    def get(self, key, ):
+        """Return dict of arrays stored under key or None."""
+        n = self._name(key)
+        p = self._path(key)
+        if(n not in self.entries or not os.path.exists(p)):
+            return None
+        try:
+            with numpy.load(p) as z:
+                d = {k: z[k] for k in z.files}
+        except Exception:
+            # damaged or incomplete file, treat as miss
+            self._remove(n)
+            return None
+        # mark as recently used
+        os.utime(p, None)
+        self.entries[n] = (os.stat(p).st_mtime, self.entries[n][1], )
+        return d
+    
+    def put(self, key, data, ):
+        """Store dict of arrays under key and evict old entries if needed."""
+        n = self._name(key)
+        p = self._path(key)
+        with open("{0}.tmp".format(p), 'wb') as f:
+            numpy.savez(f, **data)
+        # swap files
+        self._remove(n)
+        shutil.move("{0}.tmp".format(p), p)
+        st = os.stat(p)
+        self.entries[n] = (st.st_mtime, st.st_size, )
+        self.total += st.st_size
+        if(self.total > self.max_size):
+            self.evict()
+    
+    def evict(self):
+        # oldest first
+        es = sorted(self.entries.items(), key=lambda e: e[1][0], )
+        for n, _ in es:
+            if(self.total <= self.max_size):
+                break
+            self._remove(n)
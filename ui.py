@@ -539,6 +539,25 @@ class ExportOptionsPanel(RenderButtonsPanel, Panel):
         c.prop(m, 'export_use_subdivision')
         c.enabled = False
         
+        r = sub.row()
+        r.prop(m, 'export_direct_tessellation')
+        r.prop(m, 'export_auto_instances')
+        
+        r = sub.row()
+        r.prop(m, 'export_pipelined')
+        if(platform.system() == 'Darwin'):
+            r.enabled = False
+        
+        r = sub.row()
+        r.prop(m, 'export_mesh_cache')
+        c = r.column()
+        c.prop(m, 'export_mesh_cache_size')
+        if(not m.export_mesh_cache):
+            c.enabled = False
+        
+        r = sub.row()
+        r.prop(m, 'export_animation_reuse_meshes')
+        
         sub.separator()
         
         r = sub.row()
@@ -555,6 +574,12 @@ class ExportOptionsPanel(RenderButtonsPanel, Panel):
         c.prop(m, 'export_keep_intermediates')
         if(platform.system() != 'Darwin'):
             c.enabled = False
+        
+        r = sub.row()
+        r.prop(m, 'export_intermediates_single_precision')
+        r.prop(m, 'export_intermediates_compression')
+        if(platform.system() != 'Darwin'):
+            r.enabled = False
 
 
 class ExportSpecialsPanel(RenderButtonsPanel, Panel):